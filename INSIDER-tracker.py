@@ -9,7 +9,7 @@ import xml.etree.ElementTree as ET
 import json
 
 # Importa il PortfolioManager dal file separato
-from login_mysql import PortfolioManager
+from login_mysql import PortfolioManager, TransactionRow
 
 # Configurazione logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -18,602 +18,10 @@ logger = logging.getLogger(__name__)
 class ExtendedPortfolioManager(PortfolioManager):
     """
     Estensione del PortfolioManager con funzionalità insider.
-    """
     
-    def initialize_insider_tables(self) -> bool:
-        """Crea le tabelle per i dati insider nel database."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return False
-            
-        cursor = self.connection.cursor()
-        try:
-            logger.info("🔧 Creazione tabelle insider...")
-            
-            # Tabella degli insider
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insiders (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    cik VARCHAR(20) UNIQUE NOT NULL,
-                    name VARCHAR(255) NOT NULL,
-                    title VARCHAR(255),
-                    is_director BOOLEAN DEFAULT FALSE,
-                    is_officer BOOLEAN DEFAULT FALSE,
-                    is_ten_percent_owner BOOLEAN DEFAULT FALSE,
-                    is_other BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Tabella delle companies (per le insider transactions)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS companies (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    cik VARCHAR(20) UNIQUE NOT NULL,
-                    name VARCHAR(255) NOT NULL,
-                    ticker VARCHAR(10),
-                    exchange VARCHAR(50),
-                    sector VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Tabella dei filing insider (Form 4)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insider_filings (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    accession_number VARCHAR(30) UNIQUE NOT NULL,
-                    insider_id INT NOT NULL,
-                    company_id INT NOT NULL,
-                    filed_date DATE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (insider_id) REFERENCES insiders(id) ON DELETE CASCADE,
-                    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
-                    INDEX idx_filed_date (filed_date),
-                    INDEX idx_insider_company (insider_id, company_id)
-                );
-            """)
-
-            # Tabella delle transazioni insider
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insider_transactions (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    filing_id INT NOT NULL,
-                    security_title VARCHAR(255) NOT NULL,
-                    transaction_date DATE,
-                    transaction_code VARCHAR(10),
-                    transaction_shares DECIMAL(15,2) DEFAULT 0,
-                    transaction_price DECIMAL(10,4) DEFAULT 0,
-                    shares_owned_after DECIMAL(15,2) DEFAULT 0,
-                    direct_indirect VARCHAR(10) DEFAULT 'D',
-                    is_derivative BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (filing_id) REFERENCES insider_filings(id) ON DELETE CASCADE,
-                    INDEX idx_transaction_date (transaction_date),
-                    INDEX idx_transaction_code (transaction_code),
-                    INDEX idx_security_title (security_title)
-                );
-            """)
-
-            # Tabella degli holdings insider
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insider_holdings (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    filing_id INT NOT NULL,
-                    security_title VARCHAR(255) NOT NULL,
-                    shares_owned DECIMAL(15,2) DEFAULT 0,
-                    direct_indirect VARCHAR(10) DEFAULT 'D',
-                    is_derivative BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (filing_id) REFERENCES insider_filings(id) ON DELETE CASCADE,
-                    INDEX idx_security_title (security_title)
-                );
-            """)
-
-            self.connection.commit()
-            logger.info("✅ Tabelle insider create con successo.")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nella creazione delle tabelle insider: {e}")
-            self.connection.rollback()
-            return False
-        finally:
-            cursor.close()
-
-    def insert_insider(self, cik: str, name: str, title: str = None, 
-                      relationship_info: Dict[str, Any] = None) -> Optional[int]:
-        """Inserisce un nuovo insider o restituisce l'ID se già esiste."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            # Verifica se esiste già
-            cursor.execute("SELECT id FROM insiders WHERE cik = %s", (cik,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Insider con CIK {cik} già esistente, ID: {result[0]}")
-                return result[0]
-            
-            # Estrai informazioni dalla relationship se disponibile
-            is_director = False
-            is_officer = False
-            is_ten_percent = False
-            is_other = False
-            
-            if relationship_info:
-                is_director = relationship_info.get('isDirector', False)
-                is_officer = relationship_info.get('isOfficer', False) 
-                is_ten_percent = relationship_info.get('isTenPercentOwner', False)
-                is_other = relationship_info.get('isOther', False)
-                if not title and 'title' in relationship_info:
-                    title = relationship_info['title']
-            
-            # Inserisce nuovo insider
-            cursor.execute("""
-                INSERT INTO insiders (cik, name, title, is_director, is_officer, 
-                                    is_ten_percent_owner, is_other) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (cik, name, title, is_director, is_officer, is_ten_percent, is_other))
-            
-            self.connection.commit()
-            insider_id = cursor.lastrowid
-            logger.info(f"✅ Insider inserito con ID: {insider_id}")
-            return insider_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento dell'insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
-
-    def insert_company(self, cik: str, name: str, ticker: str = None, 
-                      exchange: str = None, sector: str = None) -> Optional[int]:
-        """Inserisce una nuova company o restituisce l'ID se già esiste."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            # Verifica se esiste già
-            cursor.execute("SELECT id FROM companies WHERE cik = %s", (cik,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Company con CIK {cik} già esistente, ID: {result[0]}")
-                return result[0]
-            
-            # Inserisce nuova company
-            cursor.execute("""
-                INSERT INTO companies (cik, name, ticker, exchange, sector) 
-                VALUES (%s, %s, %s, %s, %s)
-            """, (cik, name, ticker, exchange, sector))
-            
-            self.connection.commit()
-            company_id = cursor.lastrowid
-            logger.info(f"✅ Company inserita con ID: {company_id}")
-            return company_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento della company: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
-
-    def insert_insider_filing(self, accession_number: str, insider_id: int, 
-                             company_id: int, filed_date: date) -> Optional[int]:
-        """Inserisce un nuovo filing insider o restituisce l'ID se già esiste."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            # Verifica se esiste già
-            cursor.execute("SELECT id FROM insider_filings WHERE accession_number = %s", 
-                          (accession_number,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Filing insider con numero {accession_number} già esistente, ID: {result[0]}")
-                return result[0]
-            
-            # Inserisce nuovo filing
-            cursor.execute("""
-                INSERT INTO insider_filings (accession_number, insider_id, company_id, filed_date)
-                VALUES (%s, %s, %s, %s)
-            """, (accession_number, insider_id, company_id, filed_date))
-            
-            self.connection.commit()
-            filing_id = cursor.lastrowid
-            logger.info(f"✅ Filing insider inserito con ID: {filing_id}")
-            return filing_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento del filing insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
-
-    def insert_insider_transaction(self, filing_id: int, transaction_data: Dict[str, Any]) -> Optional[int]:
-        """Inserisce una nuova transazione insider."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO insider_transactions (
-                    filing_id, security_title, transaction_date, transaction_code,
-                    transaction_shares, transaction_price, shares_owned_after,
-                    direct_indirect, is_derivative
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                filing_id,
-                transaction_data.get('security_title', ''),
-                transaction_data.get('transaction_date'),
-                transaction_data.get('transaction_code', ''),
-                transaction_data.get('transaction_shares', 0),
-                transaction_data.get('transaction_price', 0),
-                transaction_data.get('shares_owned_after', 0),
-                transaction_data.get('direct_indirect', 'D'),
-                transaction_data.get('is_derivative', False)
-            ))
-            
-            self.connection.commit()
-            transaction_id = cursor.lastrowid
-            logger.info(f"✅ Transazione insider inserita con ID: {transaction_id}")
-            return transaction_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento della transazione insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
-
-    def insert_insider_holding(self, filing_id: int, holding_data: Dict[str, Any]) -> Optional[int]:
-        """Inserisce un nuovo holding insider."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO insider_holdings (
-                    filing_id, security_title, shares_owned, direct_indirect, is_derivative
-                ) VALUES (%s, %s, %s, %s, %s)
-            """, (
-                filing_id,
-                holding_data.get('security_title', ''),
-                holding_data.get('shares_owned', 0),
-                holding_data.get('direct_indirect', 'D'),
-                holding_data.get('is_derivative', False)
-            ))
-            
-            self.connection.commit()
-            holding_id = cursor.lastrowid
-            logger.info(f"✅ Holding insider inserito con ID: {holding_id}")
-            return holding_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento dell'holding insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
-
-    def insert_insider_data(self, parsed_data: Dict[str, Any]) -> bool:
-        """
-        Inserisce un set completo di dati insider (filing, transazioni, holdings).
-        
-        Args:
-            parsed_data: Dati parsati dal Form 4
-            
-        Returns:
-            True se successo, False altrimenti
-        """
-        try:
-            # Estrai informazioni
-            insider_info = parsed_data.get('insider_info', {})
-            issuer_info = parsed_data.get('issuer_info', {})
-            filing_info = parsed_data.get('filing_info', {})
-            transactions = parsed_data.get('transactions', [])
-            holdings = parsed_data.get('holdings', [])
-            
-            if not insider_info or not issuer_info:
-                logger.error("❌ Informazioni insider o issuer mancanti")
-                return False
-            
-            # 1. Inserisci insider
-            insider_id = self.insert_insider(
-                insider_info.get('cik', ''),
-                insider_info.get('name', ''),
-                insider_info.get('relationship', {}).get('title'),
-                insider_info.get('relationship', {})
-            )
-            if not insider_id:
-                logger.error("❌ Impossibile inserire l'insider")
-                return False
-            
-            # 2. Inserisci company
-            company_id = self.insert_company(
-                issuer_info.get('cik', ''),
-                issuer_info.get('name', ''),
-                issuer_info.get('ticker')
-            )
-            if not company_id:
-                logger.error("❌ Impossibile inserire la company")
-                return False
-            
-            # 3. Inserisci filing
-            filing_id = self.insert_insider_filing(
-                filing_info.get('accession_number', ''),
-                insider_id,
-                company_id,
-                filing_info.get('filed_date')
-            )
-            if not filing_id:
-                logger.error("❌ Impossibile inserire il filing")
-                return False
-            
-            # 4. Inserisci transazioni
-            successful_transactions = 0
-            for transaction_data in transactions:
-                transaction_id = self.insert_insider_transaction(filing_id, transaction_data)
-                if transaction_id:
-                    successful_transactions += 1
-            
-            # 5. Inserisci holdings
-            successful_holdings = 0
-            for holding_data in holdings:
-                holding_id = self.insert_insider_holding(filing_id, holding_data)
-                if holding_id:
-                    successful_holdings += 1
-            
-            logger.info(f"✅ Insider data inseriti: {successful_transactions} transazioni, {successful_holdings} holdings")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento dati insider completi: {e}")
-            return False
-
-    def insider_filing_exists(self, accession_number: str) -> bool:
-        """
-        Verifica se un filing insider esiste già nel database.
-        
-        Args:
-            accession_number: Numero di accesso del filing
-            
-        Returns:
-            True se il filing esiste, False altrimenti
-        """
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return False
-            
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute("SELECT id FROM insider_filings WHERE accession_number = %s", 
-                          (accession_number,))
-            result = cursor.fetchone()
-            return result is not None
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nel controllo esistenza filing insider: {e}")
-            return False
-        finally:
-            cursor.close()
-
-    def get_insider_statistics(self) -> Dict[str, Any]:
-        """
-        Recupera statistiche sui dati insider nel database.
-        
-        Returns:
-            Dizionario con statistiche
-        """
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return {}
-            
-        cursor = self.connection.cursor()
-        try:
-            stats = {}
-            
-            # Conta insider totali
-            cursor.execute("SELECT COUNT(*) FROM insiders")
-            stats['total_insiders'] = cursor.fetchone()[0]
-            
-            # Conta companies totali
-            cursor.execute("SELECT COUNT(*) FROM companies")
-            stats['total_companies'] = cursor.fetchone()[0]
-            
-            # Conta filing insider totali
-            cursor.execute("SELECT COUNT(*) FROM insider_filings")
-            stats['total_insider_filings'] = cursor.fetchone()[0]
-            
-            # Conta transazioni totali
-            cursor.execute("SELECT COUNT(*) FROM insider_transactions")
-            stats['total_insider_transactions'] = cursor.fetchone()[0]
-            
-            # Conta holdings totali
-            cursor.execute("SELECT COUNT(*) FROM insider_holdings")
-            stats['total_insider_holdings'] = cursor.fetchone()[0]
-            
-            # Ultimo filing insider
-            cursor.execute("SELECT MAX(filed_date) FROM insider_filings")
-            last_filing = cursor.fetchone()[0]
-            stats['last_insider_filing_date'] = last_filing
-            
-            return stats
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nel recupero statistiche insider: {e}")
-            return {}
-        finally:
-            cursor.close()
-
-    def get_insider_transactions(self, company_cik: str = None, insider_cik: str = None,
-                               start_date: date = None, end_date: date = None,
-                               transaction_code: str = None, limit: int = 100) -> pd.DataFrame:
-        """
-        Recupera transazioni insider con filtri opzionali.
-        
-        Args:
-            company_cik: CIK della company
-            insider_cik: CIK dell'insider  
-            start_date: Data di inizio
-            end_date: Data di fine
-            transaction_code: Codice transazione (P, S, A, etc.)
-            limit: Limite risultati
-            
-        Returns:
-            DataFrame con le transazioni
-        """
-        query = """
-            SELECT 
-                i.name as insider_name,
-                i.cik as insider_cik,
-                i.title as insider_title,
-                c.name as company_name,
-                c.cik as company_cik,
-                c.ticker as company_ticker,
-                if.accession_number,
-                if.filed_date,
-                it.security_title,
-                it.transaction_date,
-                it.transaction_code,
-                it.transaction_shares,
-                it.transaction_price,
-                it.shares_owned_after,
-                it.direct_indirect,
-                it.is_derivative,
-                (it.transaction_shares * it.transaction_price) as transaction_value
-            FROM insider_transactions it
-            JOIN insider_filings if ON it.filing_id = if.id
-            JOIN insiders i ON if.insider_id = i.id
-            JOIN companies c ON if.company_id = c.id
-        """
-        
-        conditions = []
-        params = []
-        
-        if company_cik:
-            conditions.append("c.cik = %s")
-            params.append(company_cik)
-        
-        if insider_cik:
-            conditions.append("i.cik = %s")
-            params.append(insider_cik)
-            
-        if start_date:
-            conditions.append("it.transaction_date >= %s")
-            params.append(start_date)
-            
-        if end_date:
-            conditions.append("it.transaction_date <= %s")
-            params.append(end_date)
-            
-        if transaction_code:
-            conditions.append("it.transaction_code = %s")
-            params.append(transaction_code)
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += " ORDER BY it.transaction_date DESC, if.filed_date DESC"
-        
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        # Usa il metodo _execute_query_with_columns se esiste, altrimenti fallback
-        try:
-            results, columns = self._execute_query_with_columns(query, tuple(params))
-            if results:
-                df = pd.DataFrame(results, columns=columns)
-                logger.info(f"✅ Recuperate {len(df)} transazioni insider.")
-                return df
-        except AttributeError:
-            # Fallback se _execute_query_with_columns non esiste
-            cursor = self.connection.cursor()
-            try:
-                cursor.execute(query, tuple(params))
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-                if results:
-                    df = pd.DataFrame(results, columns=columns)
-                    logger.info(f"✅ Recuperate {len(df)} transazioni insider.")
-                    return df
-            finally:
-                cursor.close()
-        
-        logger.warning("⚠️ Nessuna transazione insider trovata.")
-        return pd.DataFrame()
-
-    def get_insider_summary_by_company(self, company_cik: str = None) -> pd.DataFrame:
-        """
-        Restituisce un riassunto delle transazioni insider per company.
-        """
-        query = """
-            SELECT
-                c.name as company_name,
-                c.cik as company_cik,
-                c.ticker as company_ticker,
-                COUNT(DISTINCT i.id) as total_insiders,
-                COUNT(DISTINCT if.id) as total_filings,
-                COUNT(it.id) as total_transactions,
-                COALESCE(SUM(CASE WHEN it.transaction_code IN ('P', 'A') THEN it.transaction_shares * it.transaction_price ELSE 0 END), 0) as total_purchases,
-                COALESCE(SUM(CASE WHEN it.transaction_code = 'S' THEN it.transaction_shares * it.transaction_price ELSE 0 END), 0) as total_sales,
-                MAX(if.filed_date) as latest_filing_date,
-                MIN(if.filed_date) as earliest_filing_date
-            FROM companies c
-            LEFT JOIN insider_filings if ON c.id = if.company_id
-            LEFT JOIN insiders i ON if.insider_id = i.id
-            LEFT JOIN insider_transactions it ON if.id = it.filing_id
-        """
-        
-        params = []
-        if company_cik:
-            query += " WHERE c.cik = %s"
-            params.append(company_cik)
-        
-        query += """
-            GROUP BY c.id, c.name, c.cik, c.ticker
-            HAVING total_transactions > 0
-            ORDER BY total_transactions DESC
-        """
-        
-        # Usa il metodo _execute_query_with_columns se esiste, altrimenti fallback
-        try:
-            results, columns = self._execute_query_with_columns(query, tuple(params))
-            if results:
-                df = pd.DataFrame(results, columns=columns)
-                logger.info(f"✅ Recuperato riassunto insider per {len(df)} companies.")
-                return df
-        except AttributeError:
-            # Fallback se _execute_query_with_columns non esiste
-            cursor = self.connection.cursor()
-            try:
-                cursor.execute(query, tuple(params))
-                results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-                if results:
-                    df = pd.DataFrame(results, columns=columns)
-                    logger.info(f"✅ Recuperato riassunto insider per {len(df)} companies.")
-                    return df
-            finally:
-                cursor.close()
-        
-        logger.warning("⚠️ Nessun dato insider trovato.")
-        return pd.DataFrame()
+    Tabelle, inserimenti e letture insider sono ereditati da PortfolioManager
+    (login_mysql.py), così le due versioni non possono divergere.
+    """
 
 
 class SECInsiderDownloader:
@@ -705,16 +113,17 @@ class SECInsiderDownloader:
                 logger.info(f"ℹ️ Nessun Form 4 trovato per CIK {cik}")
                 return pd.DataFrame()
             
-            # Converte le date per il filtraggio
-            form4_filings['filingDate'] = pd.to_datetime(form4_filings['filingDate']).dt.date
-            
-            # Applica filtri di data se specificati
+            # Filtra sulle date in datetime64 (confronti vettorizzati); la conversione
+            # in oggetti date avviene una volta sola, sulle righe rimaste
+            filing_dates = pd.to_datetime(form4_filings['filingDate'])
+            in_range = pd.Series(True, index=form4_filings.index)
             if start_date:
-                form4_filings = form4_filings[form4_filings['filingDate'] >= start_date]
+                in_range &= filing_dates >= pd.Timestamp(start_date)
             if end_date:
-                form4_filings = form4_filings[form4_filings['filingDate'] <= end_date]
+                in_range &= filing_dates <= pd.Timestamp(end_date)
             
-            form4_filings = form4_filings.reset_index(drop=True)
+            form4_filings = form4_filings[in_range].reset_index(drop=True)
+            form4_filings['filingDate'] = filing_dates[in_range].dt.date.to_numpy()
             
             # FIX: URL corretto per i documenti EDGAR
             form4_filings['accession_withdash'] = form4_filings['accessionNumber']
@@ -894,7 +303,7 @@ class SECInsiderDownloader:
         
         return issuer_info
     # 2. Correzione del metodo _extract_transactions 
-    def _extract_transactions(self, soup) -> List[Dict[str, Any]]:
+    def _extract_transactions(self, soup) -> List[TransactionRow]:
         """Estrai transazioni con metodo più robusto"""
         transactions = []
         
@@ -936,7 +345,7 @@ class SECInsiderDownloader:
         
         return holdings
 
-    def _parse_transaction_element(self, transaction_elem, is_derivative: bool = False) -> Optional[Dict[str, Any]]:
+    def _parse_transaction_element(self, transaction_elem, is_derivative: bool = False) -> Optional[TransactionRow]:
         """
         Parsa una singola transazione dal XML Form 4.
         """
@@ -999,13 +408,13 @@ class SECInsiderDownloader:
             if direct_elem:
                 trans_data['direct_indirect'] = direct_elem.get_text(strip=True)
             
-            return trans_data
+            return TransactionRow(**trans_data)
             
         except Exception as e:
             logger.warning(f"⚠️ Errore nel parsing della transazione: {e}")
             return None
     # 3. OPZIONALE: Aggiungere il metodo _parse_transaction_element_robust se vuoi mantenerlo
-    def _parse_transaction_element_robust(self, transaction_elem, is_derivative: bool = False) -> Optional[Dict[str, Any]]:
+    def _parse_transaction_element_robust(self, transaction_elem, is_derivative: bool = False) -> Optional[TransactionRow]:
         """
         Versione più robusta del parsing delle transazioni con fallback multipli.
         """
@@ -1092,7 +501,7 @@ class SECInsiderDownloader:
                     trans_data['direct_indirect'] = elem.get_text(strip=True)
                     break
             
-            return trans_data
+            return TransactionRow(**trans_data)
             
         except Exception as e:
             logger.warning(f"⚠️ Errore nel parsing robusto della transazione: {e}")
@@ -1158,9 +567,9 @@ class SECInsiderDownloader:
                     total_value = 0
                     
                     for trans in transactions:
-                        code = trans.get('transaction_code', 'Unknown')
-                        shares = trans.get('transaction_shares', 0)
-                        price = trans.get('transaction_price', 0)
+                        code = trans.transaction_code
+                        shares = trans.transaction_shares
+                        price = trans.transaction_price
                         value = shares * price
                         
                         if code not in trans_codes:
@@ -1202,7 +611,12 @@ class SECInsiderDownloader:
                 filings_df = filings_df.head(limit_filings)
                 logger.info(f"📋 Processamento limitato a {limit_filings} filing più recenti")
             
-            # 3. Processa ogni filing
+            # 3. Recupera in blocco i filing già presenti nel database
+            existing_filings = self.portfolio_manager.insider_filings_exist(
+                filings_df['accessionNumber'].tolist()
+            )
+            
+            # 4. Processa ogni filing
             total_transactions = 0
             total_holdings = 0
             successful_filings = 0
@@ -1214,7 +628,7 @@ class SECInsiderDownloader:
                     logger.info(f"   Filing Date: {filing_row['filingDate']}")
                     
                     # Verifica se il filing esiste già
-                    if self.portfolio_manager.insider_filing_exists(filing_row['accessionNumber']):
+                    if filing_row['accessionNumber'] in existing_filings:
                         logger.info(f"⚠️ Filing {filing_row['accessionNumber']} già presente nel database, skip")
                         continue
                     
@@ -1,17 +1,405 @@
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+import numpy as np
 import pandas as pd
 import sqlalchemy
 from datetime import datetime, date
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any, NamedTuple, Set, Union
 import logging
 from tabulate import tabulate
 import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import functools
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from urllib.parse import quote_plus
+
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
 
 # Configurazione logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Colonne con semantica intera (valori 13F e numero di azioni)
+INTEGER_COLUMNS = {'value', 'shares', 'total_value', 'total_shares'}
+
+# Valori ammessi per positions.share_type (sshPrnamtType dei 13F: azioni o principal amount)
+SHARE_TYPES = ('SH', 'PRN')
+
+def normalize_share_type(share_type: Optional[str]) -> Optional[str]:
+    """
+    Riporta share_type alla forma della colonna ENUM('SH', 'PRN').
+    
+    Spazi e minuscole vengono corretti, il valore vuoto diventa None; qualsiasi
+    altro valore solleva ValueError invece di essere rifiutato dal server.
+    """
+    if share_type is None:
+        return None
+    normalized = str(share_type).strip().upper()
+    if not normalized:
+        return None
+    if normalized not in SHARE_TYPES:
+        raise ValueError(f"share_type non valido: {share_type!r} (ammessi: {', '.join(SHARE_TYPES)})")
+    return normalized
+
+# Lunghezza minima dei token indicizzati da InnoDB FULLTEXT (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+# Istruzioni DDL delle tabelle insider (CREATE TABLE IF NOT EXISTS: ripeterle è innocuo)
+INSIDER_TABLES_DDL = [
+    # Tabella degli insider
+    """
+CREATE TABLE IF NOT EXISTS insiders (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    cik VARCHAR(20) UNIQUE NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    title VARCHAR(255),
+    is_director BOOLEAN DEFAULT FALSE,
+    is_officer BOOLEAN DEFAULT FALSE,
+    is_ten_percent_owner BOOLEAN DEFAULT FALSE,
+    is_other BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+    """,
+    # Tabella delle companies (per le insider transactions)
+    """
+CREATE TABLE IF NOT EXISTS companies (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    cik VARCHAR(20) UNIQUE NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    ticker VARCHAR(10),
+    exchange VARCHAR(50),
+    sector VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+    """,
+    # Tabella dei filing insider (Form 4)
+    """
+CREATE TABLE IF NOT EXISTS insider_filings (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    accession_number VARCHAR(30) UNIQUE NOT NULL,
+    insider_id INT NOT NULL,
+    company_id INT NOT NULL,
+    filed_date DATE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (insider_id) REFERENCES insiders(id) ON DELETE CASCADE,
+    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
+    INDEX idx_filed_date (filed_date),
+    INDEX idx_insider_company (insider_id, company_id)
+)
+    """,
+    # Tabella delle transazioni insider
+    """
+CREATE TABLE IF NOT EXISTS insider_transactions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    filing_id INT NOT NULL,
+    security_title VARCHAR(255) NOT NULL,
+    transaction_date DATE,
+    transaction_code CHAR(2),
+    transaction_shares DECIMAL(15,2) DEFAULT 0,
+    transaction_price DECIMAL(10,4) DEFAULT 0,
+    shares_owned_after DECIMAL(15,2) DEFAULT 0,
+    direct_indirect CHAR(1) DEFAULT 'D',
+    is_derivative BOOLEAN DEFAULT FALSE,
+    transaction_value DECIMAL(25,6) GENERATED ALWAYS AS (transaction_shares * transaction_price) STORED,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (filing_id) REFERENCES insider_filings(id) ON DELETE CASCADE,
+    INDEX idx_security_title (security_title)
+)
+    """,
+    # Tabella degli holdings insider
+    """
+CREATE TABLE IF NOT EXISTS insider_holdings (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    filing_id INT NOT NULL,
+    security_title VARCHAR(255) NOT NULL,
+    shares_owned DECIMAL(15,2) DEFAULT 0,
+    direct_indirect CHAR(1) DEFAULT 'D',
+    is_derivative BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (filing_id) REFERENCES insider_filings(id) ON DELETE CASCADE,
+    INDEX idx_security_title (security_title)
+)
+    """,
+]
+
+# Le DDL unite in un unico script, inviato con una sola execute: da mysql-connector 9.2
+# execute() accetta più statement senza multi=True e i risultati si scorrono con nextset()
+INSIDER_TABLES_SCRIPT = ";\n".join(statement.strip() for statement in INSIDER_TABLES_DDL)
+
+# Colonne scritte per ciascuna tabella insider e se l'insert è un upsert sulla
+# chiave naturale univoca (cik, accession_number)
+INSIDER_INSERT_SPECS = {
+    'insiders': (['cik', 'name', 'title', 'is_director', 'is_officer',
+                  'is_ten_percent_owner', 'is_other'], True),
+    'companies': (['cik', 'name', 'ticker', 'exchange', 'sector'], True),
+    'insider_filings': (['accession_number', 'insider_id', 'company_id', 'filed_date'], True),
+    'insider_transactions': (['filing_id', 'security_title', 'transaction_date', 'transaction_code',
+                              'transaction_shares', 'transaction_price', 'shares_owned_after',
+                              'direct_indirect', 'is_derivative'], False),
+    'insider_holdings': (['filing_id', 'security_title', 'shares_owned',
+                          'direct_indirect', 'is_derivative'], False),
+}
+
+def _build_insert_sql(table: str, columns: List[str], upsert: bool) -> str:
+    """Genera lo statement INSERT di una tabella a partire dalle sue colonne."""
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+           f"VALUES ({', '.join(['%s'] * len(columns))})")
+    if upsert:
+        # LAST_INSERT_ID(id) fa restituire a lastrowid anche l'ID esistente
+        sql += " ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)"
+    return sql
+
+# Statement generati una sola volta all'import, usati da _insert_row e bulk_insert
+INSERT_SQL = {
+    table: _build_insert_sql(table, columns, upsert)
+    for table, (columns, upsert) in INSIDER_INSERT_SPECS.items()
+}
+
+INSERT_INSIDER_TRANSACTION_SQL = INSERT_SQL['insider_transactions']
+INSERT_INSIDER_HOLDING_SQL = INSERT_SQL['insider_holdings']
+
+# Colonne delle tabelle insider aggiunte anche su database esistenti: (tabella, nome, definizione).
+# transaction_value è materializzata in scrittura, così letture e aggregati non
+# ricalcolano shares * price riga per riga.
+INSIDER_COLUMNS = [
+    ('insider_transactions', 'transaction_value',
+     'DECIMAL(25,6) GENERATED ALWAYS AS (transaction_shares * transaction_price) STORED'),
+]
+
+# Indici delle tabelle insider creati anche su database esistenti: (tabella, nome, colonne).
+# idx_transaction_date_filing serve l'ORDER BY di get_insider_transactions e
+# porta con sé filing_id per la JOIN con insider_filings.
+INSIDER_INDEXES = [
+    ('insider_transactions', 'idx_transaction_date_filing', '(transaction_date, filing_id)'),
+    ('insider_transactions', 'idx_code_value', '(transaction_code, transaction_value)'),
+    # Filtro per codice e periodo del visualizzatore; filing_id rende l'indice coprente per la JOIN
+    ('insider_transactions', 'idx_it_code_date', '(transaction_code, transaction_date, filing_id)'),
+    # Stesso filtro partendo dai filing della company (query per ticker del visualizzatore)
+    ('insider_transactions', 'idx_it_filing_code_date', '(filing_id, transaction_code, transaction_date)'),
+    ('companies', 'idx_companies_ticker', '(ticker)'),
+    # Copre JOIN e GROUP BY di get_insider_summary_by_company (l'id è incluso implicitamente da InnoDB)
+    ('insider_filings', 'idx_ifl_company', '(company_id, insider_id, filed_date)'),
+]
+
+# Indici della prima versione dello schema resi inutili da INSIDER_INDEXES: sono
+# prefissi sinistri di indici composti e rallenterebbero solo gli inserimenti.
+# idx_transaction_date -> idx_transaction_date_filing; idx_transaction_code -> idx_code_value
+INSIDER_REDUNDANT_INDEXES = [
+    ('insider_transactions', 'idx_transaction_date'),
+    ('insider_transactions', 'idx_transaction_code'),
+]
+
+class TransactionRow(NamedTuple):
+    """
+    Transazione insider parsata da un Form 4, con i default già applicati.
+    
+    I campi seguono l'ordine delle colonne di INSERT_INSIDER_TRANSACTION_SQL
+    (escluso filing_id), così la riga va in executemany senza lookup per campo.
+    """
+    security_title: str = ''
+    transaction_date: Optional[date] = None
+    transaction_code: str = ''
+    transaction_shares: float = 0
+    transaction_price: float = 0
+    shares_owned_after: float = 0
+    direct_indirect: str = 'D'
+    is_derivative: bool = False
+
+# Numero massimo di righe per singola executemany nei caricamenti massivi
+INSERT_BATCH_SIZE = 10000
+
+# Righe lette per blocco dalle query che possono restituire molti risultati
+READ_CHUNK_SIZE = 10000
+
+# Numero massimo di accession number per singola query IN (...)
+EXISTS_BATCH_SIZE = 1000
+
+# Numero di connessioni mantenute nel pool MySQL
+POOL_SIZE = 8
+
+# Durata in secondi dei risultati memorizzati dai getter aggregati
+QUERY_CACHE_TTL = 30
+
+# Numero massimo di CIK mantenuti nelle cache CIK -> ID di insider e company
+ID_CACHE_SIZE = 100000
+
+# Errori InnoDB per cui un Form 4 viene ritentato: deadlock (1213) e lock wait timeout (1205)
+LOCK_RETRY_ERRNOS = (1213, 1205)
+LOCK_RETRY_ATTEMPTS = 5
+LOCK_RETRY_DELAY = 0.05
+
+def ttl_cache(seconds: float = QUERY_CACHE_TTL):
+    """
+    Memorizza per `seconds` secondi il DataFrame restituito da un getter.
+    
+    La chiave comprende nome del metodo, argomenti e self._schema_version,
+    che viene incrementata da ogni scrittura (vedi invalidates_cache); un
+    risultato letto mentre la versione cambiava non viene memorizzato.
+    I risultati vuoti non vengono memorizzati. Ogni chiamata riceve una copia:
+    modificare il DataFrame restituito non altera la cache.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, args, frozenset(kwargs.items()), self._schema_version)
+            now = time.monotonic()
+            cached = self._query_cache.get(key)
+            if cached and now - cached[0] < seconds:
+                return cached[1].copy()
+            
+            result = method(self, *args, **kwargs)
+            if not result.empty:
+                with self._cache_lock:
+                    if key[-1] == self._schema_version:
+                        self._query_cache[key] = (now, result.copy())
+            return result
+        return wrapper
+    return decorator
+
+def invalidates_cache(method):
+    """
+    Invalida la cache dei getter prima e dopo un'operazione di scrittura (anche dai worker di ingest_many).
+    
+    La seconda invalidazione scarta i risultati letti mentre la scrittura era
+    in corso, che altrimenti resterebbero in cache con la nuova versione.
+    """
+    def invalidate(self):
+        with self._cache_lock:
+            self._schema_version += 1
+            self._query_cache.clear()
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        invalidate(self)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            invalidate(self)
+    return wrapper
+
+def _is_lock_error(exc: Exception) -> bool:
+    """True se l'eccezione è un deadlock o un lock wait timeout di InnoDB."""
+    return isinstance(exc, Error) and exc.errno in LOCK_RETRY_ERRNOS
+
+def mysql_uri(config: Dict[str, Any]) -> str:
+    """
+    URI mysql:// per connectorx a partire dai parametri di mysql.connector.connect.
+    
+    Va costruito solo dove serve: la password vi compare in chiaro.
+    """
+    return (
+        f"mysql://{quote_plus(str(config.get('user', '')))}:"
+        f"{quote_plus(str(config.get('password', '')))}@"
+        f"{config.get('host', 'localhost')}:{config.get('port', 3306)}/"
+        f"{config.get('database', '')}"
+    )
+
+def _safe_close(connection) -> None:
+    """Chiude una connessione ignorando gli errori."""
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+class LazyConnectionPool:
+    """
+    Pool di connessioni MySQL aperte solo quando servono, fino a pool_size.
+    
+    Ogni connessione fa un solo handshake (MySQLConnectionPool rifà config() e
+    reconnect() alla prima richiesta di quelle aggiunte dall'esterno) e il pool
+    tiene l'elenco delle connessioni fisiche: close() le chiude direttamente,
+    senza prenderle in prestito né interrogare il server.
+    """
+    
+    def __init__(self, config: Dict[str, Any], pool_size: int = POOL_SIZE, on_connect=None):
+        """
+        Args:
+            config: Parametri di mysql.connector.connect
+            pool_size: Numero massimo di connessioni aperte
+            on_connect: Funzione chiamata su ogni connessione appena aperta o riconnessa
+        """
+        self.pool_size = pool_size
+        self._config = config
+        self._on_connect = on_connect
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+    
+    def get_connection(self):
+        """
+        Restituisce una connessione libera, aprendone una nuova se tutte sono in uso.
+        
+        Le connessioni cadute vengono riaperte; con il pool al completo solleva PoolError.
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            return self._open_connection()
+        
+        if not connection.is_connected():
+            try:
+                connection.reconnect()
+            except Error:
+                self._idle.put(connection)
+                raise
+            if self._on_connect:
+                self._on_connect(connection)
+        return connection
+    
+    def _open_connection(self):
+        """Apre una nuova connessione fisica; PoolError se il pool è al completo."""
+        with self._lock:
+            if len(self._connections) >= self.pool_size:
+                raise PoolError(f"Pool esaurito: {self.pool_size} connessioni già in uso")
+            connection = mysql.connector.connect(**self._config)
+            if self._on_connect:
+                self._on_connect(connection)
+            self._connections.append(connection)
+            return connection
+    
+    def release(self, connection) -> None:
+        """Rimette la connessione tra quelle libere, scartando eventuali righe non lette."""
+        try:
+            if connection.unread_result:
+                connection.consume_results()
+        except Error:
+            # Connessione inutilizzabile: alla prossima richiesta is_connected() la riaprirà
+            pass
+        self._idle.put(connection)
+    
+    def close(self) -> None:
+        """Chiude tutte le connessioni fisiche aperte dal pool, anche quelle in prestito."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            _safe_close(connection)
+        self._idle = queue.LifoQueue()
+
+def _close_pool_resources(pool: Optional[LazyConnectionPool], engine) -> None:
+    """Chiude le connessioni fisiche del pool e l'engine SQLAlchemy (usata da weakref.finalize)."""
+    if pool is not None:
+        pool.close()
+    if engine is not None:
+        try:
+            engine.dispose()
+        except Exception:
+            pass
+
 class PortfolioManager:
     """
     Sistema unificato per la gestione completa dei dati di portafoglio.
@@ -34,35 +422,87 @@ class PortfolioManager:
         self.password = password
         self.database = database
         self.port = port
+        self.pool = None
+        self._local = threading.local()
         self.connection = None
         self.engine = None
+        self._finalizer = None
+        self._query_cache = {}
+        self._cache_lock = threading.Lock()
+        self._prep = {}
+        self._insider_ids = OrderedDict()
+        self._company_ids = OrderedDict()
+        self._id_lock = threading.Lock()
+        self._schema_version = 0
+        self.use_fulltext_search = True
         
         # Inizializza connessioni
         self._initialize_connections()
 
     def _initialize_connections(self):
-        """Inizializza sia la connessione MySQL che l'engine SQLAlchemy."""
-        self.connection = self._create_server_connection()
-        if self.connection:
+        """Inizializza il pool MySQL, la connessione principale e l'engine SQLAlchemy."""
+        self.pool = self._create_connection_pool()
+        if self.pool:
+            # Connessione principale, usata dalle operazioni di scrittura in sequenza
+            self.connection = self.pool.get_connection()
             self.engine = self._create_engine_mysql()
+            # Chiusura di sicurezza se l'istanza non viene usata con "with"
+            self._finalizer = weakref.finalize(self, _close_pool_resources, self.pool, self.engine)
+
+    @property
+    def connection(self):
+        """Connessione del thread corrente: quella del worker in ingest_many, altrimenti la principale."""
+        return getattr(self._local, 'connection', None) or self._connection
 
-    def _create_server_connection(self) -> Optional[mysql.connector.MySQLConnection]:
-        """Crea una connessione al server MySQL."""
+    @connection.setter
+    def connection(self, value):
+        self._connection = value
+
+    def _create_connection_pool(self) -> Optional[LazyConnectionPool]:
+        """
+        Crea il pool di connessioni al server MySQL, senza aprirle tutte subito.
+        
+        Il pool parte con la sola connessione principale; le altre (fino a
+        POOL_SIZE) vengono aperte quando servono, tipicamente ai worker di ingest_many.
+        """
+        self._connection_config = {
+            'host': self.host,
+            'port': self.port,
+            'user': self.user,
+            'password': self.password,
+            'database': self.database,
+            'autocommit': False,
+            # LOAD DATA LOCAL INFILE (bulk_load_transactions) solo per file nella cartella temporanea
+            'allow_local_infile_in_path': tempfile.gettempdir(),
+        }
+        pool = LazyConnectionPool(self._connection_config, POOL_SIZE)
         try:
-            connection = mysql.connector.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                autocommit=False
-            )
-            logger.info("✅ Connesso al database MySQL.")
-            return connection
+            # Apre subito la connessione principale: verifica credenziali e raggiungibilità
+            pool.release(pool.get_connection())
+            logger.info("✅ Connesso al database MySQL (pool di connessioni).")
+            return pool
         except Error as err:
             logger.error(f"❌ Errore nella connessione: {err}")
+            pool.close()
             return None
 
+    @contextmanager
+    def pooled_connection(self):
+        """
+        Prende in prestito una connessione dal pool per un'operazione logica.
+        
+        In caso di eccezione la transazione viene annullata; all'uscita la
+        connessione torna al pool.
+        """
+        conn = self.pool.get_connection()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.release(conn)
+
     def _create_engine_mysql(self) -> sqlalchemy.engine.Engine:
         """Crea un engine SQLAlchemy per operazioni avanzate."""
         try:
@@ -75,39 +515,320 @@ class PortfolioManager:
             return None
 
     def _execute_query(self, query: str, params: tuple = None) -> List[tuple]:
-        """Esegue una query e restituisce i risultati."""
-        if not self.connection:
+        """Esegue una query su una connessione del pool e restituisce i risultati."""
+        if not self.pool:
             logger.error("❌ Nessuna connessione al database disponibile.")
             return []
             
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params or ())
+                results = cursor.fetchall()
+                return results
+            except Error as e:
+                logger.error(f"❌ Errore nell'esecuzione della query: {e}")
+                return []
+            finally:
+                cursor.close()
+
+    def _execute_query_with_columns(self, query: str, params: tuple = None) -> tuple:
+        """Esegue una query su una connessione del pool e restituisce risultati con nomi delle colonne."""
+        if not self.pool:
+            logger.error("❌ Nessuna connessione al database disponibile.")
+            return [], []
+            
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params or ())
+                results = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description]
+                return results, columns
+            except Error as e:
+                logger.error(f"❌ Errore nell'esecuzione della query: {e}")
+                return [], []
+            finally:
+                cursor.close()
+
+    def _prepared_cursor(self, key: str):
+        """
+        Restituisce un cursore preparato (protocollo binario) riusato tra le chiamate.
+        
+        Rieseguendo la stessa SQL sullo stesso cursore il server non ripete
+        parsing e planning. I cursori vengono chiusi in close_connection
+        (quelli dei worker di ingest_many alla fine del rispettivo blocco).
+        """
+        prep = getattr(self._local, 'prep', self._prep)
+        cursor = prep.get(key)
+        if cursor is None:
+            cursor = self.connection.cursor(prepared=True)
+            prep[key] = cursor
+        return cursor
+
+    def _cached_id(self, cache: OrderedDict, cik: str) -> Optional[int]:
+        """Restituisce l'ID memorizzato per il CIK, marcandolo come usato di recente."""
+        with self._id_lock:
+            row_id = cache.get(cik)
+            if row_id is not None:
+                cache.move_to_end(cik)
+            return row_id
+
+    def _remember_id(self, cache: OrderedDict, cik: str, row_id: int) -> None:
+        """Memorizza CIK -> ID scartando la voce meno recente oltre ID_CACHE_SIZE."""
+        if not cik or not row_id:
+            return
+        with self._id_lock:
+            cache[cik] = row_id
+            cache.move_to_end(cik)
+            if len(cache) > ID_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    def _ensure_columns(self, cursor, columns: List[tuple]) -> None:
+        """Aggiunge le colonne (tabella, nome, definizione) non ancora presenti nel database."""
+        cursor.execute("""
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = %s
+        """, (self.database,))
+        existing = {(row[0], row[1]) for row in cursor.fetchall()}
+        
+        for table, column_name, definition in columns:
+            if (table, column_name) not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column_name} {definition}")
+                logger.info(f"✅ Colonna {column_name} aggiunta a {table}.")
+
+    def _ensure_indexes(self, cursor, indexes: List[tuple], redundant: List[tuple] = ()) -> None:
+        """
+        Crea gli indici (tabella, nome, colonne) non ancora presenti nel database.
+        
+        Gli indici `redundant` (tabella, nome), sostituiti da quelli appena
+        garantiti, vengono eliminati se ancora presenti.
+        """
+        cursor.execute("""
+            SELECT DISTINCT table_name, index_name FROM information_schema.statistics
+            WHERE table_schema = %s
+        """, (self.database,))
+        existing = {(row[0], row[1]) for row in cursor.fetchall()}
+        
+        for table, index_name, columns in indexes:
+            if (table, index_name) not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD INDEX {index_name} {columns}")
+                logger.info(f"✅ Indice {index_name} creato su {table}.")
+        
+        for table, index_name in redundant:
+            if (table, index_name) in existing:
+                cursor.execute(f"ALTER TABLE {table} DROP INDEX {index_name}")
+                logger.info(f"🗑️ Indice ridondante {index_name} rimosso da {table}.")
+
+    def _executemany_in_batches(self, cursor, query: str, rows: List[tuple]) -> None:
+        """Esegue executemany a blocchi di INSERT_BATCH_SIZE righe (nessun commit)."""
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            cursor.executemany(query, rows[start:start + INSERT_BATCH_SIZE])
+
+    def _insert_row(self, table: str, row: tuple, commit: bool = True) -> Optional[int]:
+        """
+        Inserisce una riga con lo statement generato in INSERT_SQL e ne restituisce l'ID.
+        
+        Ogni tabella ha il proprio cursore preparato; per le tabelle in upsert
+        l'ID restituito è quello della riga esistente.
+        """
+        if not self.connection:
+            logger.error("❌ Nessuna connessione al database disponibile.")
+            return None
+            
+        cursor = self._prepared_cursor(table)
+        try:
+            cursor.execute(INSERT_SQL[table], row)
+            if commit:
+                self.connection.commit()
+            return cursor.lastrowid
+            
+        except Exception as e:
+            # Nella transazione del chiamante i conflitti di lock risalgono per essere ritentati
+            if not commit and _is_lock_error(e):
+                raise
+            logger.error(f"❌ Errore nell'inserimento in {table}: {e}")
+            self.connection.rollback()
+            return None
+
+    @invalidates_cache
+    def bulk_insert(self, table: str, rows: List[tuple], commit: bool = True) -> bool:
+        """
+        Inserisce in blocco le righe di una tabella insider con executemany.
+        
+        Args:
+            table: Tabella presente in INSIDER_INSERT_SPECS
+            rows: Tuple di valori nell'ordine delle colonne della tabella
+            commit: Con False la scrittura resta nella transazione del chiamante
+            
+        Returns:
+            True se successo, False altrimenti
+        """
+        if not self.connection:
+            logger.error("❌ Nessuna connessione al database disponibile.")
+            return False
+            
         cursor = self.connection.cursor()
         try:
-            cursor.execute(query, params or ())
-            results = cursor.fetchall()
-            return results
-        except Error as e:
-            logger.error(f"❌ Errore nell'esecuzione della query: {e}")
-            return []
+            self._executemany_in_batches(cursor, INSERT_SQL[table], rows)
+            if commit:
+                self.connection.commit()
+            return True
+            
+        except Exception as e:
+            # Nella transazione del chiamante i conflitti di lock risalgono per essere ritentati
+            if not commit and _is_lock_error(e):
+                raise
+            logger.error(f"❌ Errore nell'inserimento in blocco in {table}: {e}")
+            self.connection.rollback()
+            return False
         finally:
             cursor.close()
 
-    def _execute_query_with_columns(self, query: str, params: tuple = None) -> tuple:
-        """Esegue una query e restituisce risultati con nomi delle colonne."""
+    @staticmethod
+    def _tsv_value(value: Any) -> str:
+        """Serializza un valore nel formato di default di LOAD DATA (\\N per NULL, escape con \\)."""
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+    @invalidates_cache
+    def bulk_load_transactions(self, rows: List[tuple]) -> bool:
+        """
+        Carica transazioni insider con LOAD DATA LOCAL INFILE, per i backfill storici.
+        
+        Le righe, nell'ordine delle colonne di INSERT_INSIDER_TRANSACTION_SQL,
+        vengono scritte in un TSV temporaneo che il server importa con un solo
+        comando. Richiede local_infile=1 sul server MySQL.
+        
+        Args:
+            rows: Tuple (filing_id, security_title, ..., is_derivative)
+            
+        Returns:
+            True se successo, False altrimenti
+        """
         if not self.connection:
             logger.error("❌ Nessuna connessione al database disponibile.")
-            return [], []
-            
+            return False
+        
+        columns, _ = INSIDER_INSERT_SPECS['insider_transactions']
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8',
+                                         newline='', delete=False) as tsv_file:
+            for row in rows:
+                tsv_file.write('\t'.join(self._tsv_value(v) for v in row))
+                tsv_file.write('\n')
+            tsv_path = tsv_file.name
+        
         cursor = self.connection.cursor()
         try:
-            cursor.execute(query, params or ())
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            return results, columns
-        except Error as e:
-            logger.error(f"❌ Errore nell'esecuzione della query: {e}")
-            return [], []
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE '{tsv_path.replace(os.sep, '/')}'
+                INTO TABLE insider_transactions
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(columns)})
+            """)
+            self.connection.commit()
+            logger.info(f"✅ Caricate {len(rows)} transazioni insider con LOAD DATA.")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Errore nel caricamento massivo delle transazioni insider: {e}")
+            self.connection.rollback()
+            return False
         finally:
             cursor.close()
+            os.remove(tsv_path)
+
+    def _build_dataframe(self, results: List[tuple], columns: List[str]) -> pd.DataFrame:
+        """
+        Costruisce un DataFrame convertendo le colonne DECIMAL in dtype numerici.
+        
+        mysql-connector restituisce i DECIMAL come decimal.Decimal, che pandas
+        memorizza come object: li convertiamo subito in float64 (o intero per
+        le colonne in INTEGER_COLUMNS) così le aggregazioni restano vettoriali.
+        """
+        return self._convert_decimal_columns(pd.DataFrame(results, columns=columns))
+
+    def _convert_decimal_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte le colonne di decimal.Decimal in float64 (interi per INTEGER_COLUMNS)."""
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            first_valid = df[col].first_valid_index()
+            if first_valid is None or not isinstance(df[col].loc[first_valid], Decimal):
+                continue
+            
+            df[col] = pd.to_numeric(df[col])
+            if col in INTEGER_COLUMNS:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        return df
+
+    def _read_dataframe(self, query: str, params: tuple = None) -> pd.DataFrame:
+        """
+        Esegue una query e restituisce direttamente un DataFrame.
+        
+        Se connectorx è installato e la query non ha parametri, il risultato
+        viene letto in buffer colonnari Arrow; altrimenti si usa il cursore MySQL.
+        Entrambe le strade restituiscono gli stessi dtype: i DECIMAL passano per
+        _convert_decimal_columns come in _build_dataframe.
+        """
+        if cx is not None and not params:
+            try:
+                table = cx.read_sql(mysql_uri(self._connection_config), query, return_type="arrow")
+                if table.num_rows == 0:
+                    return pd.DataFrame()
+                return self._convert_decimal_columns(table.to_pandas())
+            except Exception as e:
+                logger.warning(f"⚠️ Lettura connectorx fallita, uso il cursore MySQL: {e}")
+        
+        results, columns = self._execute_query_with_columns(query, params)
+        if not results:
+            return pd.DataFrame()
+        return self._build_dataframe(results, columns)
+
+    def _read_dataframe_chunked(self, query: str, params: tuple = None,
+                                chunksize: int = READ_CHUNK_SIZE) -> pd.DataFrame:
+        """
+        Legge il risultato a blocchi di `chunksize` righe con fetchmany.
+        
+        Il cursore non bufferizzato lascia le righe sul server finché non
+        vengono richieste: in memoria restano solo le tuple del blocco corrente,
+        subito convertite in colonne tipizzate, invece dell'intero fetchall().
+        """
+        if not self.pool:
+            logger.error("❌ Nessuna connessione al database disponibile.")
+            return pd.DataFrame()
+            
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params or ())
+                columns = [desc[0] for desc in cursor.description]
+                chunks = []
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    chunks.append(self._build_dataframe(rows, columns))
+            except Error as e:
+                logger.error(f"❌ Errore nell'esecuzione della query: {e}")
+                return pd.DataFrame()
+            finally:
+                cursor.close()
+        
+        if not chunks:
+            return pd.DataFrame()
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
 
     # ==================== FUNZIONI DI SETUP ====================
 
@@ -116,6 +837,7 @@ class PortfolioManager:
         logger.info("🔧 Inizializzazione database...")
         return self.create_tables_schema()
 
+    @invalidates_cache
     def create_tables_schema(self) -> bool:
         """Crea lo schema delle tabelle nel database."""
         if not self.connection:
@@ -157,10 +879,19 @@ class PortfolioManager:
                     cusip VARCHAR(20) UNIQUE NOT NULL,
                     name VARCHAR(255) NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    FULLTEXT KEY ft_name (name)
                 );
             """)
 
+            # Indice FULLTEXT anche per tabelle securities create prima del suo ingresso nello schema
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.statistics
+                WHERE table_schema = %s AND table_name = 'securities' AND index_name = 'ft_name'
+            """, (self.database,))
+            if cursor.fetchone()[0] == 0:
+                cursor.execute("ALTER TABLE securities ADD FULLTEXT KEY ft_name (name)")
+
             # Tabella delle posizioni
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS positions (
@@ -169,7 +900,7 @@ class PortfolioManager:
                     security_id INT NOT NULL,
                     value BIGINT NOT NULL DEFAULT 0,
                     shares BIGINT NOT NULL DEFAULT 0,
-                    share_type VARCHAR(50),
+                    share_type ENUM('SH', 'PRN'),
                     investment_discretion VARCHAR(50),
                     voting_authority VARCHAR(50),
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -192,8 +923,83 @@ class PortfolioManager:
         finally:
             cursor.close()
 
+    @invalidates_cache
+    def migrate_column_widths(self) -> bool:
+        """
+        Allinea le tabelle esistenti alle larghezze ridotte dello schema
+        (share_type ENUM, transaction_code CHAR(2), direct_indirect CHAR(1)).
+
+        Ogni tabella viene convertita con un solo ALTER TABLE; le tabelle
+        non ancora create vengono ignorate. Se positions contiene share_type
+        diversi da SH/PRN (a meno di spazi e maiuscole) la migrazione non parte
+        e i valori vengono elencati nel log.
+
+        Returns:
+            True se la migrazione è riuscita, False altrimenti
+        """
+        if not self.connection:
+            logger.error("❌ Nessuna connessione al database disponibile.")
+            return False
+
+        migrations = {
+            'positions': [
+                # Solo spazi e maiuscole: i valori non riconducibili bloccano la migrazione
+                "UPDATE positions SET share_type = UPPER(TRIM(share_type)) WHERE share_type IS NOT NULL",
+                "ALTER TABLE positions MODIFY share_type ENUM('SH', 'PRN')"
+            ],
+            'insider_transactions': [
+                """ALTER TABLE insider_transactions
+                    MODIFY transaction_code CHAR(2),
+                    MODIFY direct_indirect CHAR(1) DEFAULT 'D'"""
+            ],
+            'insider_holdings': [
+                "ALTER TABLE insider_holdings MODIFY direct_indirect CHAR(1) DEFAULT 'D'"
+            ]
+        }
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT table_name FROM information_schema.tables
+                WHERE table_schema = %s
+            """, (self.database,))
+            existing_tables = {row[0] for row in cursor.fetchall()}
+
+            # Nessun dato viene scartato: con share_type non convertibili la migrazione si ferma
+            if 'positions' in existing_tables:
+                cursor.execute("""
+                    SELECT share_type, COUNT(*) FROM positions
+                    WHERE share_type IS NOT NULL AND UPPER(TRIM(share_type)) NOT IN ('SH', 'PRN')
+                    GROUP BY share_type
+                """)
+                invalid = cursor.fetchall()
+                if invalid:
+                    logger.error("❌ Migrazione annullata: positions contiene share_type non validi "
+                                 "(ammessi: SH, PRN). Correggerli prima di ripetere la migrazione:")
+                    for value, count in invalid:
+                        logger.error(f"   {value!r}: {count} righe")
+                    return False
+
+            for table, statements in migrations.items():
+                if table not in existing_tables:
+                    continue
+                for statement in statements:
+                    cursor.execute(statement)
+                logger.info(f"✅ Tabella {table} migrata.")
+
+            self.connection.commit()
+            return True
+
+        except Error as e:
+            logger.error(f"❌ Errore nella migrazione delle colonne: {e}")
+            self.connection.rollback()
+            return False
+        finally:
+            cursor.close()
+
     # ==================== FUNZIONI DI INSERIMENTO ====================
 
+    @invalidates_cache
     def insert_fund(self, cik: str, name: str) -> Optional[int]:
         """Inserisce un nuovo fondo o restituisce l'ID se già esiste."""
         if not self.connection:
@@ -223,6 +1029,7 @@ class PortfolioManager:
         finally:
             cursor.close()
 
+    @invalidates_cache
     def insert_security(self, cusip: str, name: str) -> Optional[int]:
         """Inserisce un nuovo titolo o restituisce l'ID se già esiste."""
         if not self.connection:
@@ -252,6 +1059,7 @@ class PortfolioManager:
         finally:
             cursor.close()
 
+    @invalidates_cache
     def insert_filing(self, fund_id: int, accession_number: str, 
                     report_date: Union[datetime, date], 
                     filed_date: Union[datetime, date]) -> Optional[int]:
@@ -291,14 +1099,21 @@ class PortfolioManager:
             return None
         finally:
             cursor.close()
+    @invalidates_cache
     def insert_position(self, filing_id: int, security_id: int, value: int, 
                     shares: int, share_type: str = None, 
                     investment_discretion: str = None, 
                     voting_authority: str = None) -> Optional[int]:
-        """Inserisce una nuova posizione."""
+        """Inserisce una nuova posizione (share_type: SH, PRN o None)."""
         if not self.connection:
             logger.error("❌ Nessuna connessione al database disponibile.")
             return None
+        
+        try:
+            share_type = normalize_share_type(share_type)
+        except ValueError as e:
+            logger.error(f"❌ Posizione non inserita: {e}")
+            return None
             
         cursor = self.connection.cursor()
         try:
@@ -599,12 +1414,20 @@ class PortfolioManager:
                 logger.error("❌ Test connessione fallito")
                 return False
                 
-            # Verifica tabelle
+            # Verifica tabelle: un solo round trip su information_schema invece di un
+            # COUNT(*) (scansione completa) per tabella. TABLE_ROWS è una stima di InnoDB.
             tables = ['funds', 'filings', 'securities', 'positions']
+            cursor.execute("""
+                SELECT table_name, table_rows FROM information_schema.tables
+                WHERE table_schema = %s AND table_name IN (%s, %s, %s, %s)
+            """, (self.database, *tables))
+            row_estimates = {row[0]: row[1] for row in cursor.fetchall()}
+            
             for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                count = cursor.fetchone()[0]
-                logger.info(f"✅ Tabella {table}: {count} record")
+                if table not in row_estimates:
+                    logger.error(f"❌ Tabella {table} non trovata")
+                    return False
+                logger.info(f"✅ Tabella {table}: ~{row_estimates[table] or 0} record")
                 
             return True
             
@@ -696,6 +1519,7 @@ class PortfolioManager:
 
     # ==================== FUNZIONI DI ESTRAZIONE ====================
 
+    @ttl_cache(seconds=QUERY_CACHE_TTL)
     def get_all_funds(self) -> pd.DataFrame:
         """Restituisce tutti i fondi nel database."""
         query = """
@@ -705,10 +1529,9 @@ class PortfolioManager:
             ORDER BY name
         """
         
-        results, columns = self._execute_query_with_columns(query)
+        df = self._read_dataframe(query)
         
-        if results:
-            df = pd.DataFrame(results, columns=columns)
+        if not df.empty:
             logger.info(f"✅ Recuperati {len(df)} fondi.")
             return df
         else:
@@ -757,8 +1580,16 @@ class PortfolioManager:
             params.append(min_value)
         
         if security_name:
-            conditions.append("s.name LIKE %s")
-            params.append(f"%{security_name}%")
+            # MATCH ... AGAINST usa l'indice FULLTEXT; sotto la lunghezza minima
+            # dei token InnoDB si ricade sul LIKE (scansione completa)
+            words = re.findall(r'\w+', security_name)
+            if (self.use_fulltext_search and words
+                    and min(len(w) for w in words) >= FULLTEXT_MIN_TOKEN_SIZE):
+                conditions.append("MATCH(s.name) AGAINST (%s IN BOOLEAN MODE)")
+                params.append(' '.join(f"+{w}*" for w in words))
+            else:
+                conditions.append("s.name LIKE %s")
+                params.append(f"%{security_name}%")
         
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
@@ -768,13 +1599,14 @@ class PortfolioManager:
         results, columns = self._execute_query_with_columns(query, tuple(params))
         
         if results:
-            df = pd.DataFrame(results, columns=columns)
+            df = self._build_dataframe(results, columns)
             logger.info(f"✅ Recuperate {len(df)} posizioni.")
             return df
         else:
             logger.warning("⚠️ Nessuna posizione trovata.")
             return pd.DataFrame()
 
+    @ttl_cache(seconds=QUERY_CACHE_TTL)
     def get_portfolio_summary(self) -> pd.DataFrame:
         """Restituisce un riassunto aggregato per fondo basato sui soli ultimi filings."""
         query = """
@@ -806,18 +1638,18 @@ class PortfolioManager:
         ORDER BY total_value DESC
         """
         
-        results, columns = self._execute_query_with_columns(query)
-        if results:
-            df = pd.DataFrame(results, columns=columns)
+        df = self._read_dataframe(query)
+        if not df.empty:
             logger.info(f"✅ Recuperato riassunto per {len(df)} fondi.")
             return df
         else:
             logger.warning("⚠️ Nessun dato trovato per il riassunto.")
             return pd.DataFrame()
 
+    @ttl_cache(seconds=QUERY_CACHE_TTL)
     def get_top_positions(self, limit: int = 10) -> pd.DataFrame:
         """Restituisce le posizioni con valore più alto."""
-        query = """
+        query = f"""
             SELECT 
                 f.name as fund_name,
                 s.name as security_name,
@@ -825,20 +1657,20 @@ class PortfolioManager:
                 p.value,
                 p.shares,
                 p.share_type,
-                fi.report_date,
-                RANK() OVER (ORDER BY p.value DESC) as value_rank
+                fi.report_date
             FROM positions p
             JOIN filings fi ON p.filing_id = fi.id
             JOIN funds f ON fi.fund_id = f.id
             JOIN securities s ON p.security_id = s.id
             ORDER BY p.value DESC
-            LIMIT %s
+            LIMIT {int(limit)}
         """
         
-        results, columns = self._execute_query_with_columns(query, (limit,))
+        df = self._read_dataframe(query)
         
-        if results:
-            df = pd.DataFrame(results, columns=columns)
+        if not df.empty:
+            # Le righe arrivano già ordinate per valore: il rank è un contatore locale
+            df.insert(0, 'value_rank', np.arange(1, len(df) + 1, dtype=np.int32))
             logger.info(f"✅ Recuperate top {len(df)} posizioni per valore.")
             return df
         else:
@@ -855,25 +1687,33 @@ class PortfolioManager:
             print(f"\n❌ {title}: Nessun dato disponibile")
             return
         
-        # Crea una copia per la formattazione
-        display_df = df.copy()
-        
-        # Formattazione valuta
-        if format_money:
-            for col in format_money:
-                if col in display_df.columns:
-                    display_df[col] = display_df[col].apply(
-                        lambda x: f"${x:,.2f}" if pd.notna(x) and x != 0 else "$0.00"
-                    )
-        
-        # Formattazione numeri
-        if format_numbers:
-            for col in format_numbers:
-                if col in display_df.columns:
-                    display_df[col] = display_df[col].apply(
-                        lambda x: f"{x:,}" if pd.notna(x) else "0"
-                    )
-        
+        # Nessuna colonna da formattare: si visualizza direttamente il frame sorgente
+        columns_to_format = set(format_money or []) | set(format_numbers or [])
+        if not columns_to_format & set(df.columns):
+            display_df = df
+        else:
+            # Proiezione senza copia: solo le colonne formattate vengono ricreate,
+            # le altre restano riferimenti alle Series originali
+            out = {col: df[col] for col in df.columns}
+
+            # Formattazione valuta
+            if format_money:
+                for col in format_money:
+                    if col in out:
+                        out[col] = df[col].apply(
+                            lambda x: f"${x:,.2f}" if pd.notna(x) and x != 0 else "$0.00"
+                        )
+
+            # Formattazione numeri
+            if format_numbers:
+                for col in format_numbers:
+                    if col in out:
+                        out[col] = df[col].apply(
+                            lambda x: f"{x:,}" if pd.notna(x) else "0"
+                        )
+
+            display_df = pd.DataFrame(out, copy=False)
+
         print(f"\n{'='*100}")
         print(f"📊 {title}")
         print(f"{'='*100}")
@@ -1131,7 +1971,11 @@ class PortfolioManager:
                         print("❌ Valore o numero azioni non valido")
                         continue
                     
-                    share_type = input("Tipo azioni (opzionale): ").strip() or None
+                    try:
+                        share_type = normalize_share_type(input("Tipo azioni (SH/PRN, opzionale): "))
+                    except ValueError as e:
+                        print(f"❌ {e}")
+                        continue
                     investment_discretion = input("Discrezionalità investimento (opzionale): ").strip() or None
                     voting_authority = input("Autorità di voto (opzionale): ").strip() or None
                     
@@ -1292,15 +2136,22 @@ class PortfolioManager:
     #                 print("❌ Inserimento annullato")
 
     def close_connection(self):
-                """Chiude la connessione al database."""
-                if self.connection:
-                    self.connection.close()
+                """Chiude tutte le connessioni del pool e l'engine SQLAlchemy."""
+                if self._finalizer:
+                    self._finalizer.detach()
+                    self._finalizer = None
+                for cursor in self._prep.values():
+                    cursor.close()
+                self._prep.clear()
+                # La connessione principale è del pool: viene chiusa insieme alle altre
+                self.connection = None
+                # Connessioni fisiche aperte dal pool (anche quelle dei worker) ed engine
+                _close_pool_resources(self.pool, self.engine)
+                self.engine = None
+                if self.pool:
+                    self.pool = None
                     logger.info("🔒 Connessione database chiusa")
 
-    def __del__(self):
-                """Destructor per chiudere automaticamente la connessione."""
-                self.close_connection()
-
     def __enter__(self):
                 """Context manager entry."""
                 return self
@@ -1308,6 +2159,7 @@ class PortfolioManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
                 """Context manager exit."""
                 self.close_connection()
+    @invalidates_cache
     def initialize_insider_tables(self) -> bool:
         """Crea le tabelle per i dati insider nel database."""
         if not self.connection:
@@ -1318,87 +2170,15 @@ class PortfolioManager:
         try:
             logger.info("🔧 Creazione tabelle insider...")
             
-            # Tabella degli insider
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insiders (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    cik VARCHAR(20) UNIQUE NOT NULL,
-                    name VARCHAR(255) NOT NULL,
-                    title VARCHAR(255),
-                    is_director BOOLEAN DEFAULT FALSE,
-                    is_officer BOOLEAN DEFAULT FALSE,
-                    is_ten_percent_owner BOOLEAN DEFAULT FALSE,
-                    is_other BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Tabella delle companies (per le insider transactions)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS companies (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    cik VARCHAR(20) UNIQUE NOT NULL,
-                    name VARCHAR(255) NOT NULL,
-                    ticker VARCHAR(10),
-                    exchange VARCHAR(50),
-                    sector VARCHAR(100),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                );
-            """)
-
-            # Tabella dei filing insider (Form 4)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insider_filings (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    accession_number VARCHAR(30) UNIQUE NOT NULL,
-                    insider_id INT NOT NULL,
-                    company_id INT NOT NULL,
-                    filed_date DATE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (insider_id) REFERENCES insiders(id) ON DELETE CASCADE,
-                    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
-                    INDEX idx_filed_date (filed_date),
-                    INDEX idx_insider_company (insider_id, company_id)
-                );
-            """)
+            # Un solo round trip per tutte le tabelle; i risultati vanno consumati
+            # prima di usare di nuovo il cursore
+            cursor.execute(INSIDER_TABLES_SCRIPT)
+            while cursor.nextset():
+                pass
 
-            # Tabella delle transazioni insider
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insider_transactions (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    filing_id INT NOT NULL,
-                    security_title VARCHAR(255) NOT NULL,
-                    transaction_date DATE,
-                    transaction_code VARCHAR(10),
-                    transaction_shares DECIMAL(15,2) DEFAULT 0,
-                    transaction_price DECIMAL(10,4) DEFAULT 0,
-                    shares_owned_after DECIMAL(15,2) DEFAULT 0,
-                    direct_indirect VARCHAR(10) DEFAULT 'D',
-                    is_derivative BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (filing_id) REFERENCES insider_filings(id) ON DELETE CASCADE,
-                    INDEX idx_transaction_date (transaction_date),
-                    INDEX idx_transaction_code (transaction_code),
-                    INDEX idx_security_title (security_title)
-                );
-            """)
-
-            # Tabella degli holdings insider
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS insider_holdings (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    filing_id INT NOT NULL,
-                    security_title VARCHAR(255) NOT NULL,
-                    shares_owned DECIMAL(15,2) DEFAULT 0,
-                    direct_indirect VARCHAR(10) DEFAULT 'D',
-                    is_derivative BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (filing_id) REFERENCES insider_filings(id) ON DELETE CASCADE,
-                    INDEX idx_security_title (security_title)
-                );
-            """)
+            # Colonne e indici aggiunti dopo la prima versione dello schema
+            self._ensure_columns(cursor, INSIDER_COLUMNS)
+            self._ensure_indexes(cursor, INSIDER_INDEXES, INSIDER_REDUNDANT_INDEXES)
 
             self.connection.commit()
             logger.info("✅ Tabelle insider create con successo.")
@@ -1411,268 +2191,267 @@ class PortfolioManager:
         finally:
             cursor.close()
 
+    @invalidates_cache
     def insert_insider(self, cik: str, name: str, title: str = None, 
-                    relationship_info: Dict[str, Any] = None) -> Optional[int]:
-        """Inserisce un nuovo insider o restituisce l'ID se già esiste."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            # Verifica se esiste già
-            cursor.execute("SELECT id FROM insiders WHERE cik = %s", (cik,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Insider con CIK {cik} già esistente, ID: {result[0]}")
-                return result[0]
-            
-            # Estrai informazioni dalla relationship se disponibile
-            is_director = False
-            is_officer = False
-            is_ten_percent = False
-            is_other = False
-            
-            if relationship_info:
-                is_director = relationship_info.get('isDirector', False)
-                is_officer = relationship_info.get('isOfficer', False) 
-                is_ten_percent = relationship_info.get('isTenPercentOwner', False)
-                is_other = relationship_info.get('isOther', False)
-                if not title and 'title' in relationship_info:
-                    title = relationship_info['title']
-            
-            # Inserisce nuovo insider
-            cursor.execute("""
-                INSERT INTO insiders (cik, name, title, is_director, is_officer, 
-                                    is_ten_percent_owner, is_other) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (cik, name, title, is_director, is_officer, is_ten_percent, is_other))
-            
-            self.connection.commit()
-            insider_id = cursor.lastrowid
-            logger.info(f"✅ Insider inserito con ID: {insider_id}")
-            return insider_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento dell'insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
-
+                    relationship_info: Dict[str, Any] = None, commit: bool = True) -> Optional[int]:
+        """
+        Inserisce un nuovo insider o restituisce l'ID se già esiste.
+        
+        Con commit=False la scrittura resta nella transazione del chiamante.
+        """
+        # Evita il round trip per i CIK già risolti in questa sessione
+        cached_id = self._cached_id(self._insider_ids, cik)
+        if cached_id is not None:
+            return cached_id
+        
+        # Estrai informazioni dalla relationship se disponibile
+        relationship_info = relationship_info or {}
+        if not title:
+            title = relationship_info.get('title')
+        
+        insider_id = self._insert_row('insiders', (
+            cik, name, title,
+            relationship_info.get('isDirector', False),
+            relationship_info.get('isOfficer', False),
+            relationship_info.get('isTenPercentOwner', False),
+            relationship_info.get('isOther', False)
+        ), commit)
+        
+        if insider_id and commit:
+            self._remember_id(self._insider_ids, cik, insider_id)
+        if insider_id:
+            logger.debug("✅ Insider con CIK %s registrato con ID: %s", cik, insider_id)
+        return insider_id
+
+    @invalidates_cache
     def insert_company(self, cik: str, name: str, ticker: str = None, 
-                    exchange: str = None, sector: str = None) -> Optional[int]:
-        """Inserisce una nuova company o restituisce l'ID se già esiste."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            # Verifica se esiste già
-            cursor.execute("SELECT id FROM companies WHERE cik = %s", (cik,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Company con CIK {cik} già esistente, ID: {result[0]}")
-                return result[0]
-            
-            # Inserisce nuova company
-            cursor.execute("""
-                INSERT INTO companies (cik, name, ticker, exchange, sector) 
-                VALUES (%s, %s, %s, %s, %s)
-            """, (cik, name, ticker, exchange, sector))
-            
-            self.connection.commit()
-            company_id = cursor.lastrowid
-            logger.info(f"✅ Company inserita con ID: {company_id}")
-            return company_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento della company: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
+                    exchange: str = None, sector: str = None, commit: bool = True) -> Optional[int]:
+        """
+        Inserisce una nuova company o restituisce l'ID se già esiste.
+        
+        Con commit=False la scrittura resta nella transazione del chiamante.
+        """
+        # Evita il round trip per i CIK già risolti in questa sessione
+        cached_id = self._cached_id(self._company_ids, cik)
+        if cached_id is not None:
+            return cached_id
+        
+        company_id = self._insert_row('companies', (cik, name, ticker, exchange, sector), commit)
+        
+        if company_id and commit:
+            self._remember_id(self._company_ids, cik, company_id)
+        if company_id:
+            logger.debug("✅ Company con CIK %s registrata con ID: %s", cik, company_id)
+        return company_id
 
+    @invalidates_cache
     def insert_insider_filing(self, accession_number: str, insider_id: int, 
-                            company_id: int, filed_date: date) -> Optional[int]:
-        """Inserisce un nuovo filing insider o restituisce l'ID se già esiste."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            # Verifica se esiste già
-            cursor.execute("SELECT id FROM insider_filings WHERE accession_number = %s", 
-                        (accession_number,))
-            result = cursor.fetchone()
-            if result:
-                logger.info(f"Filing insider con numero {accession_number} già esistente, ID: {result[0]}")
-                return result[0]
-            
-            # Inserisce nuovo filing
-            cursor.execute("""
-                INSERT INTO insider_filings (accession_number, insider_id, company_id, filed_date)
-                VALUES (%s, %s, %s, %s)
-            """, (accession_number, insider_id, company_id, filed_date))
-            
-            self.connection.commit()
-            filing_id = cursor.lastrowid
-            logger.info(f"✅ Filing insider inserito con ID: {filing_id}")
-            return filing_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento del filing insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
+                            company_id: int, filed_date: date, commit: bool = True) -> Optional[int]:
+        """
+        Inserisce un nuovo filing insider o restituisce l'ID se già esiste.
+        
+        Con commit=False la scrittura resta nella transazione del chiamante.
+        """
+        filing_id = self._insert_row(
+            'insider_filings', (accession_number, insider_id, company_id, filed_date), commit
+        )
+        if filing_id:
+            logger.debug("✅ Filing insider %s registrato con ID: %s", accession_number, filing_id)
+        return filing_id
+
+    def _transaction_row(self, filing_id: int,
+                         transaction_data: Union[TransactionRow, Dict[str, Any]]) -> tuple:
+        """Costruisce la tupla di valori per INSERT_INSIDER_TRANSACTION_SQL."""
+        if isinstance(transaction_data, TransactionRow):
+            return (filing_id, *transaction_data)
+        return (
+            filing_id,
+            transaction_data.get('security_title', ''),
+            transaction_data.get('transaction_date'),
+            transaction_data.get('transaction_code', ''),
+            transaction_data.get('transaction_shares', 0),
+            transaction_data.get('transaction_price', 0),
+            transaction_data.get('shares_owned_after', 0),
+            transaction_data.get('direct_indirect', 'D'),
+            transaction_data.get('is_derivative', False)
+        )
 
-    def insert_insider_transaction(self, filing_id: int, transaction_data: Dict[str, Any]) -> Optional[int]:
-        """Inserisce una nuova transazione insider."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO insider_transactions (
-                    filing_id, security_title, transaction_date, transaction_code,
-                    transaction_shares, transaction_price, shares_owned_after,
-                    direct_indirect, is_derivative
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                filing_id,
-                transaction_data.get('security_title', ''),
-                transaction_data.get('transaction_date'),
-                transaction_data.get('transaction_code', ''),
-                transaction_data.get('transaction_shares', 0),
-                transaction_data.get('transaction_price', 0),
-                transaction_data.get('shares_owned_after', 0),
-                transaction_data.get('direct_indirect', 'D'),
-                transaction_data.get('is_derivative', False)
-            ))
-            
-            self.connection.commit()
-            transaction_id = cursor.lastrowid
-            logger.info(f"✅ Transazione insider inserita con ID: {transaction_id}")
-            return transaction_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento della transazione insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
+    def _holding_row(self, filing_id: int, holding_data: Dict[str, Any]) -> tuple:
+        """Costruisce la tupla di valori per INSERT_INSIDER_HOLDING_SQL."""
+        return (
+            filing_id,
+            holding_data.get('security_title', ''),
+            holding_data.get('shares_owned', 0),
+            holding_data.get('direct_indirect', 'D'),
+            holding_data.get('is_derivative', False)
+        )
 
-    def insert_insider_holding(self, filing_id: int, holding_data: Dict[str, Any]) -> Optional[int]:
-        """Inserisce un nuovo holding insider."""
-        if not self.connection:
-            logger.error("❌ Nessuna connessione al database disponibile.")
-            return None
-            
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO insider_holdings (
-                    filing_id, security_title, shares_owned, direct_indirect, is_derivative
-                ) VALUES (%s, %s, %s, %s, %s)
-            """, (
-                filing_id,
-                holding_data.get('security_title', ''),
-                holding_data.get('shares_owned', 0),
-                holding_data.get('direct_indirect', 'D'),
-                holding_data.get('is_derivative', False)
-            ))
-            
-            self.connection.commit()
-            holding_id = cursor.lastrowid
-            logger.info(f"✅ Holding insider inserito con ID: {holding_id}")
-            return holding_id
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento dell'holding insider: {e}")
-            self.connection.rollback()
-            return None
-        finally:
-            cursor.close()
+    @invalidates_cache
+    def insert_insider_transaction(self, filing_id: int,
+                                   transaction_data: Union[TransactionRow, Dict[str, Any]],
+                                   commit: bool = True) -> Optional[int]:
+        """
+        Inserisce una nuova transazione insider.
+        
+        Con commit=False la scrittura resta nella transazione del chiamante.
+        """
+        transaction_id = self._insert_row(
+            'insider_transactions', self._transaction_row(filing_id, transaction_data), commit
+        )
+        if transaction_id:
+            logger.debug("✅ Transazione insider inserita con ID: %s", transaction_id)
+        return transaction_id
+
+    @invalidates_cache
+    def insert_insider_holding(self, filing_id: int, holding_data: Dict[str, Any],
+                               commit: bool = True) -> Optional[int]:
+        """
+        Inserisce un nuovo holding insider.
+        
+        Con commit=False la scrittura resta nella transazione del chiamante.
+        """
+        holding_id = self._insert_row(
+            'insider_holdings', self._holding_row(filing_id, holding_data), commit
+        )
+        if holding_id:
+            logger.debug("✅ Holding insider inserito con ID: %s", holding_id)
+        return holding_id
 
+    @invalidates_cache
     def insert_insider_data(self, parsed_data: Dict[str, Any]) -> bool:
         """
         Inserisce un set completo di dati insider (filing, transazioni, holdings).
         
+        Gli upsert concorrenti di ingest_many possono andare in deadlock sugli
+        indici unici: in quel caso la transazione viene annullata e il Form 4
+        ritentato fino a LOCK_RETRY_ATTEMPTS volte.
+        
         Args:
             parsed_data: Dati parsati dal Form 4
             
         Returns:
             True se successo, False altrimenti
         """
-        try:
-            # Estrai informazioni
-            insider_info = parsed_data.get('insider_info', {})
-            issuer_info = parsed_data.get('issuer_info', {})
-            filing_info = parsed_data.get('filing_info', {})
-            transactions = parsed_data.get('transactions', [])
-            holdings = parsed_data.get('holdings', [])
-            
-            if not insider_info or not issuer_info:
-                logger.error("❌ Informazioni insider o issuer mancanti")
-                return False
-            
-            # 1. Inserisci insider
-            insider_id = self.insert_insider(
-                insider_info.get('cik', ''),
-                insider_info.get('name', ''),
-                insider_info.get('relationship', {}).get('title'),
-                insider_info.get('relationship', {})
-            )
-            if not insider_id:
-                logger.error("❌ Impossibile inserire l'insider")
-                return False
-            
-            # 2. Inserisci company
-            company_id = self.insert_company(
-                issuer_info.get('cik', ''),
-                issuer_info.get('name', ''),
-                issuer_info.get('ticker')
-            )
-            if not company_id:
-                logger.error("❌ Impossibile inserire la company")
-                return False
-            
-            # 3. Inserisci filing
-            filing_id = self.insert_insider_filing(
-                filing_info.get('accession_number', ''),
-                insider_id,
-                company_id,
-                filing_info.get('filed_date')
-            )
-            if not filing_id:
-                logger.error("❌ Impossibile inserire il filing")
+        for attempt in range(1, LOCK_RETRY_ATTEMPTS + 1):
+            try:
+                return self._insert_insider_data_once(parsed_data)
+            except Exception as e:
+                self.connection.rollback()
+                if _is_lock_error(e) and attempt < LOCK_RETRY_ATTEMPTS:
+                    logger.warning(f"⚠️ Conflitto di lock (errno {e.errno}), "
+                                   f"tentativo {attempt}/{LOCK_RETRY_ATTEMPTS}: ritento il Form 4.")
+                    time.sleep(LOCK_RETRY_DELAY * attempt)
+                    continue
+                logger.error(f"❌ Errore nell'inserimento dati insider completi: {e}")
                 return False
-            
-            # 4. Inserisci transazioni
-            successful_transactions = 0
-            for transaction_data in transactions:
-                transaction_id = self.insert_insider_transaction(filing_id, transaction_data)
-                if transaction_id:
-                    successful_transactions += 1
-            
-            # 5. Inserisci holdings
-            successful_holdings = 0
-            for holding_data in holdings:
-                holding_id = self.insert_insider_holding(filing_id, holding_data)
-                if holding_id:
-                    successful_holdings += 1
-            
-            logger.info(f"✅ Insider data inseriti: {successful_transactions} transazioni, {successful_holdings} holdings")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Errore nell'inserimento dati insider completi: {e}")
+        return False
+
+    def _insert_insider_data_once(self, parsed_data: Dict[str, Any]) -> bool:
+        """Esegue un tentativo di insert_insider_data; i conflitti di lock sollevano Error."""
+        # Estrai informazioni
+        insider_info = parsed_data.get('insider_info', {})
+        issuer_info = parsed_data.get('issuer_info', {})
+        filing_info = parsed_data.get('filing_info', {})
+        transactions = parsed_data.get('transactions', [])
+        holdings = parsed_data.get('holdings', [])
+        
+        if not insider_info or not issuer_info:
+            logger.error("❌ Informazioni insider o issuer mancanti")
+            return False
+        
+        # 1. Inserisci insider
+        insider_id = self.insert_insider(
+            insider_info.get('cik', ''),
+            insider_info.get('name', ''),
+            insider_info.get('relationship', {}).get('title'),
+            insider_info.get('relationship', {}),
+            commit=False
+        )
+        if not insider_id:
+            logger.error("❌ Impossibile inserire l'insider")
+            self.connection.rollback()
+            return False
+        
+        # 2. Inserisci company
+        company_id = self.insert_company(
+            issuer_info.get('cik', ''),
+            issuer_info.get('name', ''),
+            issuer_info.get('ticker'),
+            commit=False
+        )
+        if not company_id:
+            logger.error("❌ Impossibile inserire la company")
+            self.connection.rollback()
+            return False
+        
+        # 3. Inserisci filing
+        filing_id = self.insert_insider_filing(
+            filing_info.get('accession_number', ''),
+            insider_id,
+            company_id,
+            filing_info.get('filed_date'),
+            commit=False
+        )
+        if not filing_id:
+            logger.error("❌ Impossibile inserire il filing")
+            self.connection.rollback()
+            return False
+        
+        # 4-5. Inserisci transazioni e holdings in blocco; un solo commit per l'intero Form 4
+        transaction_rows = [self._transaction_row(filing_id, t) for t in transactions]
+        holding_rows = [self._holding_row(filing_id, h) for h in holdings]
+        
+        if not (self.bulk_insert('insider_transactions', transaction_rows, commit=False)
+                and self.bulk_insert('insider_holdings', holding_rows, commit=False)):
             return False
+        
+        self.connection.commit()
+        # Gli ID entrano in cache solo dopo il commit: un rollback non lascia ID orfani
+        self._remember_id(self._insider_ids, insider_info.get('cik', ''), insider_id)
+        self._remember_id(self._company_ids, issuer_info.get('cik', ''), company_id)
+        
+        # Un solo log INFO per Form 4: i log per riga sono a livello DEBUG
+        logger.info(f"✅ Filing {filing_info.get('accession_number', '')}: "
+                    f"{len(transaction_rows)} transazioni, {len(holding_rows)} holdings inseriti")
+        return True
+
+    def _ingest_chunk(self, parsed_chunk: List[Dict[str, Any]]) -> int:
+        """Inserisce un blocco di Form 4 su una connessione del pool riservata al thread corrente."""
+        with self.pooled_connection() as conn:
+            self._local.connection = conn
+            self._local.prep = {}
+            try:
+                return sum(1 for parsed_data in parsed_chunk if self.insert_insider_data(parsed_data))
+            finally:
+                for cursor in self._local.prep.values():
+                    cursor.close()
+                del self._local.connection, self._local.prep
+
+    def ingest_many(self, parsed_list: List[Dict[str, Any]]) -> int:
+        """
+        Inserisce più Form 4 in parallelo, uno per transazione, sulle connessioni del pool.
+        
+        Ogni worker prende una connessione dal pool (esclusa quella principale)
+        e la usa per tutto il suo blocco di filing, così le latenze dei commit
+        si sovrappongono invece di sommarsi.
+        
+        Args:
+            parsed_list: Dati parsati dei Form 4, come per insert_insider_data
+            
+        Returns:
+            Numero di Form 4 inseriti con successo
+        """
+        if not self.pool or not parsed_list:
+            return 0
+        
+        workers = max(1, min(self.pool.pool_size - 1, len(parsed_list)))
+        chunks = [parsed_list[i::workers] for i in range(workers)]
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            inserted = sum(executor.map(self._ingest_chunk, chunks))
+        
+        logger.info(f"✅ Inseriti {inserted}/{len(parsed_list)} Form 4 con {workers} worker.")
+        return inserted
 
     def insider_filing_exists(self, accession_number: str) -> bool:
         """
@@ -1701,6 +2480,43 @@ class PortfolioManager:
         finally:
             cursor.close()
 
+    def insider_filings_exist(self, accession_numbers: List[str]) -> Set[str]:
+        """
+        Restituisce gli accession number già presenti nel database.
+        
+        Esegue una sola query IN (...) ogni EXISTS_BATCH_SIZE numeri di accesso,
+        invece di un round trip per filing come insider_filing_exists.
+        
+        Args:
+            accession_numbers: Numeri di accesso dei filing da verificare
+            
+        Returns:
+            Insieme dei numeri di accesso già presenti
+        """
+        existing = set()
+        if not self.connection:
+            logger.error("❌ Nessuna connessione al database disponibile.")
+            return existing
+        
+        unique_numbers = list(dict.fromkeys(accession_numbers))
+        cursor = self.connection.cursor()
+        try:
+            for start in range(0, len(unique_numbers), EXISTS_BATCH_SIZE):
+                batch = unique_numbers[start:start + EXISTS_BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f"SELECT accession_number FROM insider_filings WHERE accession_number IN ({placeholders})",
+                    batch
+                )
+                existing.update(row[0] for row in cursor.fetchall())
+            return existing
+            
+        except Exception as e:
+            logger.error(f"❌ Errore nel controllo esistenza filing insider: {e}")
+            return existing
+        finally:
+            cursor.close()
+
     def get_insider_statistics(self) -> Dict[str, Any]:
         """
         Recupera statistiche sui dati insider nel database.
@@ -1714,32 +2530,27 @@ class PortfolioManager:
             
         cursor = self.connection.cursor()
         try:
-            stats = {}
-            
-            # Conta insider totali
-            cursor.execute("SELECT COUNT(*) FROM insiders")
-            stats['total_insiders'] = cursor.fetchone()[0]
-            
-            # Conta companies totali
-            cursor.execute("SELECT COUNT(*) FROM companies")
-            stats['total_companies'] = cursor.fetchone()[0]
-            
-            # Conta filing insider totali
-            cursor.execute("SELECT COUNT(*) FROM insider_filings")
-            stats['total_insider_filings'] = cursor.fetchone()[0]
-            
-            # Conta transazioni totali
-            cursor.execute("SELECT COUNT(*) FROM insider_transactions")
-            stats['total_insider_transactions'] = cursor.fetchone()[0]
-            
-            # Conta holdings totali
-            cursor.execute("SELECT COUNT(*) FROM insider_holdings")
-            stats['total_insider_holdings'] = cursor.fetchone()[0]
-            
-            # Ultimo filing insider
-            cursor.execute("SELECT MAX(filed_date) FROM insider_filings")
-            last_filing = cursor.fetchone()[0]
-            stats['last_insider_filing_date'] = last_filing
+            # Tutti i conteggi e l'ultimo filing in un solo round trip
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM insiders),
+                    (SELECT COUNT(*) FROM companies),
+                    (SELECT COUNT(*) FROM insider_filings),
+                    (SELECT COUNT(*) FROM insider_transactions),
+                    (SELECT COUNT(*) FROM insider_holdings),
+                    (SELECT MAX(filed_date) FROM insider_filings)
+            """)
+            (total_insiders, total_companies, total_filings,
+             total_transactions, total_holdings, last_filing) = cursor.fetchone()
+            
+            stats = {
+                'total_insiders': total_insiders,
+                'total_companies': total_companies,
+                'total_insider_filings': total_filings,
+                'total_insider_transactions': total_transactions,
+                'total_insider_holdings': total_holdings,
+                'last_insider_filing_date': last_filing
+            }
             
             return stats
             
@@ -1774,8 +2585,8 @@ class PortfolioManager:
                 c.name as company_name,
                 c.cik as company_cik,
                 c.ticker as company_ticker,
-                if.accession_number,
-                if.filed_date,
+                ifl.accession_number,
+                ifl.filed_date,
                 it.security_title,
                 it.transaction_date,
                 it.transaction_code,
@@ -1784,11 +2595,11 @@ class PortfolioManager:
                 it.shares_owned_after,
                 it.direct_indirect,
                 it.is_derivative,
-                (it.transaction_shares * it.transaction_price) as transaction_value
+                it.transaction_value
             FROM insider_transactions it
-            JOIN insider_filings if ON it.filing_id = if.id
-            JOIN insiders i ON if.insider_id = i.id
-            JOIN companies c ON if.company_id = c.id
+            JOIN insider_filings ifl ON it.filing_id = ifl.id
+            JOIN insiders i ON ifl.insider_id = i.id
+            JOIN companies c ON ifl.company_id = c.id
         """
         
         conditions = []
@@ -1817,15 +2628,15 @@ class PortfolioManager:
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
-        query += " ORDER BY it.transaction_date DESC, if.filed_date DESC"
+        query += " ORDER BY it.transaction_date DESC, ifl.filed_date DESC"
         
         if limit:
-            query += f" LIMIT {limit}"
+            query += " LIMIT %s"
+            params.append(int(limit))
         
-        results, columns = self._execute_query_with_columns(query, tuple(params))
+        df = self._read_dataframe_chunked(query, tuple(params))
         
-        if results:
-            df = pd.DataFrame(results, columns=columns)
+        if not df.empty:
             logger.info(f"✅ Recuperate {len(df)} transazioni insider.")
             return df
         else:
@@ -1842,16 +2653,16 @@ class PortfolioManager:
                 c.cik as company_cik,
                 c.ticker as company_ticker,
                 COUNT(DISTINCT i.id) as total_insiders,
-                COUNT(DISTINCT if.id) as total_filings,
+                COUNT(DISTINCT ifl.id) as total_filings,
                 COUNT(it.id) as total_transactions,
-                COALESCE(SUM(CASE WHEN it.transaction_code IN ('P', 'A') THEN it.transaction_shares * it.transaction_price ELSE 0 END), 0) as total_purchases,
-                COALESCE(SUM(CASE WHEN it.transaction_code = 'S' THEN it.transaction_shares * it.transaction_price ELSE 0 END), 0) as total_sales,
-                MAX(if.filed_date) as latest_filing_date,
-                MIN(if.filed_date) as earliest_filing_date
+                COALESCE(SUM(CASE WHEN it.transaction_code IN ('P', 'A') THEN it.transaction_value ELSE 0 END), 0) as total_purchases,
+                COALESCE(SUM(CASE WHEN it.transaction_code = 'S' THEN it.transaction_value ELSE 0 END), 0) as total_sales,
+                MAX(ifl.filed_date) as latest_filing_date,
+                MIN(ifl.filed_date) as earliest_filing_date
             FROM companies c
-            LEFT JOIN insider_filings if ON c.id = if.company_id
-            LEFT JOIN insiders i ON if.insider_id = i.id
-            LEFT JOIN insider_transactions it ON if.id = it.filing_id
+            LEFT JOIN insider_filings ifl ON c.id = ifl.company_id
+            LEFT JOIN insiders i ON ifl.insider_id = i.id
+            LEFT JOIN insider_transactions it ON ifl.id = it.filing_id
         """
         
         params = []
@@ -1865,10 +2676,9 @@ class PortfolioManager:
             ORDER BY total_transactions DESC
         """
         
-        results, columns = self._execute_query_with_columns(query, tuple(params))
+        df = self._read_dataframe(query, tuple(params))
         
-        if results:
-            df = pd.DataFrame(results, columns=columns)
+        if not df.empty:
             logger.info(f"✅ Recuperato riassunto insider per {len(df)} companies.")
             return df
         else:
@@ -1881,30 +2691,25 @@ class PortfolioManager:
             print(f"\n❌ {title}: Nessun dato disponibile")
             return
         
-        # Crea una copia per la formattazione
-        display_df = df.copy()
+        # Mostra solo colonne più importanti per il display: si copiano solo
+        # queste, non l'intero risultato della JOIN
+        display_columns = ['insider_name', 'company_ticker', 'transaction_date', 'transaction_code', 
+                        'transaction_shares', 'transaction_price', 'transaction_value']
         
-        # Formattazione valori monetari
-        if 'transaction_value' in display_df.columns:
-            display_df['transaction_value'] = display_df['transaction_value'].apply(
-                lambda x: f"${x:,.2f}" if pd.notna(x) and x != 0 else "$0.00"
-            )
+        available_columns = [col for col in display_columns if col in df.columns]
+        display_df = df[available_columns].copy() if available_columns else df.copy()
         
-        if 'transaction_price' in display_df.columns:
-            display_df['transaction_price'] = display_df['transaction_price'].apply(
-                lambda x: f"${x:.2f}" if pd.notna(x) and x != 0 else "$0.00"
-            )
+        # Formattazione valori monetari: NaN e zero diventano "$0.00" con una
+        # sola maschera vettoriale, senza una lambda per cella
+        for col, fmt in (('transaction_value', "{:,.2f}"), ('transaction_price', "{:.2f}")):
+            if col in display_df.columns:
+                values = display_df[col].fillna(0)
+                display_df[col] = np.where(values == 0, "$0.00", "$" + values.map(fmt.format))
         
         # Formattazione numeri
-        if 'transaction_shares' in display_df.columns:
-            display_df['transaction_shares'] = display_df['transaction_shares'].apply(
-                lambda x: f"{x:,.0f}" if pd.notna(x) else "0"
-            )
-        
-        if 'shares_owned_after' in display_df.columns:
-            display_df['shares_owned_after'] = display_df['shares_owned_after'].apply(
-                lambda x: f"{x:,.0f}" if pd.notna(x) else "0"
-            )
+        for col in ('transaction_shares', 'shares_owned_after'):
+            if col in display_df.columns:
+                display_df[col] = display_df[col].fillna(0).map("{:,.0f}".format)
         
         print(f"\n{'='*120}")
         print(f"📊 {title}")
@@ -1912,18 +2717,7 @@ class PortfolioManager:
         print(f"Totale record: {len(df)}")
         print(f"{'='*120}")
         
-        # Mostra solo colonne più importanti per il display
-        display_columns = ['insider_name', 'company_ticker', 'transaction_date', 'transaction_code', 
-                        'transaction_shares', 'transaction_price', 'transaction_value']
-        
-        available_columns = [col for col in display_columns if col in display_df.columns]
-        
-        if available_columns:
-            from tabulate import tabulate
-            print(tabulate(display_df[available_columns], headers='keys', tablefmt='grid', showindex=False))
-        else:
-            from tabulate import tabulate
-            print(tabulate(display_df, headers='keys', tablefmt='grid', showindex=False))
+        print(tabulate(display_df, headers='keys', tablefmt='grid', showindex=False))
         
         print(f"{'='*120}\n")
 
@@ -1,16 +1,228 @@
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, date, timedelta
 import logging
 import mysql.connector
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
 import numpy as np
 import os
+import sys
+import time
+import random
+import hashlib
+import re
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import subprocess
 import platform
+import pickle
+import io
+import multiprocessing
 
+from login_mysql import LazyConnectionPool, mysql_uri
+
+try:
+    from curl_cffi import requests as curl_requests
+except ImportError:
+    curl_requests = None
+
+try:
+    import connectorx as cx
+except ImportError:
+    cx = None
+
+
+# Connessioni nel pool del visualizzatore (mysql-connector ne consente al massimo 32)
+POOL_SIZE = min(32, max(4, (os.cpu_count() or 1) * 2 + 1))
+
+# Cache su disco dei prezzi scaricati da Yahoo Finance. I periodi già chiusi non
+# cambiano più; quelli che arrivano a oggi scadono dopo PRICE_CACHE_TTL secondi.
+PRICE_CACHE_DIR = os.path.join('.cache', 'prices')
+PRICE_CACHE_TTL = 3600
+
+# Cache su disco dei risultati dei loader del grafico (vendite e acquisti):
+# il database può ricevere nuovi filing anche per date passate, quindi scade sempre
+DATA_CACHE_DIR = os.path.join('.cache', 'chart_data')
+DATA_CACHE_TTL = 24 * 3600
+
+# Serie prezzi del database già lette, un file per ticker con il periodo coperto:
+# a ogni richiesta si leggono da MySQL solo i giorni mancanti
+PRICE_STORE_DIR = os.path.join('.cache', 'price_store')
+
+# Compressione dei file parquet di cache: zstd è più compatto di snappy e si legge altrettanto veloce
+PARQUET_COMPRESSION = 'zstd'
+
+# Sessione HTTP condivisa da tutti i yf.Ticker: cookie e crumb vengono negoziati una volta
+# sola. Con curl_cffi la sessione imita il browser; altrimenti yfinance usa la propria.
+_YF_SESSION = curl_requests.Session(impersonate='chrome') if curl_requests else None
+
+# Download Yahoo Finance in corso, per chiave (ticker, start, end): chi arriva dopo
+# attende lo stesso Future invece di ripetere la richiesta
+_INFLIGHT: Dict[tuple, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+# Ticker caricati in parallelo da prefetch_chart_data (limite anche per Yahoo Finance)
+PREFETCH_WORKERS = 8
+
+# Colonne DECIMAL convertite in float64 alla lettura
+DECIMAL_COLUMNS = ('transaction_shares', 'transaction_price', 'transaction_value')
+
+# Colonne lette da get_insider_sales_from_db / get_insider_purchases_from_db e dalle
+# tabelle prezzi, nello stesso ordine delle SELECT
+TRANSACTION_COLUMNS = ('transaction_date', 'transaction_shares', 'transaction_value', 'insider_name')
+PRICE_COLUMNS = ('Date', 'Close')
+
+# Righe lette dal cursore non bufferizzato a ogni fetchmany
+READ_CHUNK_SIZE = 50000
+
+# Punti massimi della linea prezzo: oltre, la serie viene ridotta con LTTB
+PRICE_PLOT_MAX_POINTS = 2000
+
+# Livello zlib per i PNG salvati (il default di matplotlib è 6)
+PNG_COMPRESS_LEVEL = 3
+
+# Tentativi massimi per download in caso di rate limit (HTTP 429)
+YF_MAX_ATTEMPTS = 3
+
+def _normalize_dates(dates: pd.Series) -> pd.Series:
+    """Converte le date in datetime64[ns] senza fuso orario (Yahoo Finance lo include, il database no)."""
+    if dates.dtype == 'datetime64[ns]':
+        # Già nel formato finale (es. colonna Arrow di connectorx): nessuna copia
+        return dates
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.astype('datetime64[ns]')
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indici dei punti scelti da Largest-Triangle-Three-Buckets.
+    
+    Primo e ultimo punto restano; per ogni bucket intermedio si tiene il punto che
+    forma il triangolo più grande con il punto scelto prima e la media del bucket
+    successivo, così picchi e minimi della serie sopravvivono alla riduzione.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+    return indices
+
+def disk_cached(kind: str, ttl: int = DATA_CACHE_TTL):
+    """
+    Decoratore per i loader (ticker, start_date, end_date) -> DataFrame.
+    
+    Il risultato viene salvato in parquet sotto DATA_CACHE_DIR e riusato finché
+    il file ha meno di `ttl` secondi. I risultati vuoti (nessun dato o errore)
+    non vengono salvati; la cache si disattiva con use_disk_cache=False.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, ticker: str, start_date: date = None, end_date: date = None) -> pd.DataFrame:
+            if not self.use_disk_cache:
+                return method(self, ticker, start_date, end_date)
+            
+            key = f"{kind}|{ticker}|{start_date}|{end_date}"
+            digest = hashlib.md5(key.encode('utf-8')).hexdigest()[:16]
+            path = _cache_path(DATA_CACHE_DIR, f"{kind}_", ticker, digest)
+            
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) <= ttl:
+                try:
+                    df = pd.read_parquet(path)
+                    logger.info("💾 %s di %s letti dalla cache: %s", kind, ticker, path)
+                    return df
+                except Exception as e:
+                    logger.warning(f"⚠️ Cache {kind} illeggibile, nuova lettura: {e}")
+            
+            df = method(self, ticker, start_date, end_date)
+            if not df.empty:
+                _write_parquet_atomic(path, df)
+            return df
+        return wrapper
+    return decorator
+
+def _write_parquet_atomic(path: str, df: pd.DataFrame) -> None:
+    """Scrive il parquet su un file temporaneo e lo rinomina: i lettori concorrenti non vedono file parziali."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, compression=PARQUET_COMPRESSION)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"⚠️ Impossibile salvare la cache su disco: {e}")
+
+# Ticker ammessi come nome di tabella nello schema dei prezzi (sidan.<TICKER>)
+TICKER_PATTERN = re.compile(r'[A-Z][A-Z0-9.\-]{0,9}')
+
+def _cache_path(directory: str, prefix: str, ticker: str, digest: str) -> str:
+    """
+    Percorso di un file parquet di cache in `directory`.
+    
+    Il ticker arriva dall'utente prima di qualsiasi validazione: compare nel nome
+    solo se rispetta TICKER_PATTERN (niente '/' né '..'), altrimenti basta il digest.
+    """
+    if TICKER_PATTERN.fullmatch(ticker or '') and '..' not in ticker:
+        prefix = f"{prefix}{ticker}_"
+    return os.path.join(directory, f"{prefix}{digest}.parquet")
+
+def _price_table(ticker: str) -> str:
+    """
+    Nome qualificato della tabella prezzi del ticker.
+    
+    Il nome tabella non può essere un parametro della query: il ticker viene
+    validato con TICKER_PATTERN e quotato, così non può iniettare SQL.
+    """
+    if not TICKER_PATTERN.fullmatch(ticker or ''):
+        raise ValueError(f"Ticker non valido come nome tabella: {ticker!r}")
+    return f"sidan.`{ticker}`"
+
+def _save_figure(fig, path: str, dpi: int, save_kwargs: Dict[str, Any]) -> None:
+    """
+    Codifica la figura in memoria e la scrive su disco con una sola scrittura.
+    
+    savefig su file emette molte piccole write (lente su dischi di rete);
+    qui l'immagine completa finisce nel file con os.write, senza buffer Python.
+    """
+    fmt = os.path.splitext(path)[1][1:].lower() or 'png'
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, **save_kwargs)
+    
+    data = memoryview(buf.getbuffer())
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def _save_figure_worker(payload: bytes, path: str, dpi: int, save_kwargs: Dict[str, Any]) -> None:
+    """Processo figlio: ricostruisce la figura serializzata e la salva (codifica PNG fuori dal processo principale)."""
+    _save_figure(pickle.loads(payload), path, dpi, save_kwargs)
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Riconosce il rate limit di Yahoo Finance (YFRateLimitError o HTTP 429)."""
+    return 'RateLimit' in type(error).__name__ or 'Too Many Requests' in str(error)
 
 # Configurazione logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,17 +234,54 @@ class InsiderSalesVisualizer:
     VERSIONE COMPLETA CON SALES (ROSSO) E PURCHASES (VERDE)
     """
     
-    def __init__(self, db_config: Dict[str, Any]):
+    # Asse delle date: formato delle etichette e numero massimo di tick. Locator e
+    # formatter restano per-grafico (matplotlib li lega al singolo asse), ma il
+    # numero di etichette da disegnare non cresce più con la lunghezza del periodo
+    DATE_FORMAT = '%Y-%m-%d'
+    MAX_DATE_TICKS = 24
+    
+    def __init__(self, db_config: Dict[str, Any], interactive: bool = True,
+                 use_disk_cache: bool = True, background_save: bool = False,
+                 allow_yf_fallback: bool = False):
         self.db_config = db_config
-        self.connection = None
+        self.use_disk_cache = use_disk_cache
+        # Yahoo Finance solo su richiesta, quando la tabella prezzi manca o è vuota
+        self.allow_yf_fallback = allow_yf_fallback
+        # Con background_save i PNG vengono codificati e scritti da processi separati
+        self.background_save = background_save
+        self._save_processes = []
+        self.pool = None
+        self._prefetched = {}
+        self._fig = None
+        # Tabelle prezzi (sidan.<TICKER>) già verificate per l'indice su Date
+        self._indexed = set()
+        self._indexed_lock = threading.Lock()
+        # Tabelle dello schema prezzi (SHOW TABLES IN sidan) lette alla connessione;
+        # None se l'elenco non è disponibile (nessun filtro)
+        self._price_tables = None
+        self.interactive = interactive
         self._setup_matplotlib()
         
     def _setup_matplotlib(self):
         """Configura matplotlib per garantire la visualizzazione."""
         import matplotlib
         
-        # Prova diversi backend fino a trovarne uno funzionante
-        backends_to_try = ['TkAgg', 'Qt5Agg', 'Qt4Agg', 'GTKAgg', 'Agg']
+        # Su Linux/Unix senza display nessun backend GUI può funzionare: inutile
+        # importarli uno per uno (Qt carica librerie pesanti) prima di arrivare ad Agg
+        headless = (platform.system() not in ('Windows', 'Darwin')
+                    and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'))
+        if headless and self.interactive:
+            logger.info("🖥️ Nessun display disponibile: grafici salvati su file")
+            self.interactive = False
+        
+        if not self.interactive:
+            # Uso batch: nessuna finestra, i grafici vengono solo salvati su file
+            matplotlib.use('Agg', force=True)
+            logger.info("🎨 Backend matplotlib impostato: Agg (non interattivo)")
+            return
+        
+        # Prova i backend GUI fino a trovarne uno funzionante
+        backends_to_try = ['TkAgg', 'Qt5Agg']
         
         for backend in backends_to_try:
             try:
@@ -42,31 +291,195 @@ class InsiderSalesVisualizer:
             except:
                 continue
         else:
-            logger.warning("⚠️ Usando backend matplotlib di default")
+            logger.warning("⚠️ Nessun backend GUI disponibile: uso Agg, grafici salvati su file")
+            matplotlib.use('Agg', force=True)
+            self.interactive = False
+            return
             
         # Configura modalità interattiva
         plt.ion()  # Abilita modalità interattiva
         
     def connect_database(self) -> bool:
-        """Stabilisce connessione al database."""
+        """
+        Crea il pool di connessioni al database.
+        
+        Gli indici delle tabelle insider usati dalle query del grafico sono
+        definiti e creati solo da PortfolioManager.initialize_insider_tables
+        (INSIDER_INDEXES in login_mysql.py).
+        """
         try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            logger.info("✅ Connessione al database stabilita")
+            # Connessioni aperte solo quando servono; ognuna porta i propri cursori
+            # preparati nell'attributo visualizer_statements
+            self.pool = LazyConnectionPool(self.db_config, POOL_SIZE,
+                                           on_connect=self._reset_statements)
+            self.pool.release(self.pool.get_connection())
+            logger.info("✅ Connessione al database stabilita (pool di connessioni)")
+            self._load_price_tables()
             return True
         except Exception as e:
             logger.error(f"❌ Errore connessione database: {e}")
+            self.close_connection()
             return False
     
+    @staticmethod
+    def _reset_statements(connection) -> None:
+        """Cursori preparati della connessione, per testo della query (vuoti dopo una riconnessione)."""
+        connection.visualizer_statements = {}
+    
+    def _load_price_tables(self) -> None:
+        """Legge una volta l'elenco delle tabelle prezzi: i ticker senza tabella non interrogano MySQL."""
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SHOW TABLES IN sidan")
+                self._price_tables = {row[0] for row in cursor.fetchall()}
+            logger.info("📋 %s tabelle prezzi disponibili nello schema sidan", len(self._price_tables))
+        except Exception as e:
+            self._price_tables = None
+            logger.warning(f"⚠️ Impossibile leggere l'elenco delle tabelle prezzi: {e}")
+    
+    def _has_price_table(self, ticker: str) -> bool:
+        """True se sidan.<TICKER> esiste (o se l'elenco delle tabelle non è disponibile)."""
+        return self._price_tables is None or ticker in self._price_tables
+    
+    def _ensure_date_index(self, ticker: str, table_name: str) -> None:
+        """
+        Crea l'indice su Date della tabella prezzi del ticker, se manca.
+        
+        Con l'indice il filtro BETWEEN diventa una ricerca per intervallo già in
+        ordine di data, senza scansione completa né ordinamento. La verifica avviene
+        alla prima lettura del ticker e poi non viene più ripetuta (errori solo segnalati).
+        """
+        with self._indexed_lock:
+            if ticker in self._indexed:
+                return
+            self._indexed.add(ticker)
+        
+        try:
+            with self._cursor(buffered=True) as cursor:
+                cursor.execute("""
+                    SELECT 1 FROM information_schema.statistics
+                    WHERE table_schema = 'sidan' AND table_name = %s
+                      AND column_name = 'Date' AND seq_in_index = 1
+                    LIMIT 1
+                """, (ticker,))
+                if cursor.fetchone() is None:
+                    cursor.execute(f"ALTER TABLE {table_name} ADD INDEX idx_date (Date)")
+                    logger.info(f"✅ Indice idx_date creato su {table_name}")
+        except Exception as e:
+            logger.warning(f"⚠️ Impossibile verificare/creare l'indice su {table_name}: {e}")
+    
     def close_connection(self):
-        """Chiude la connessione al database."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """
+        Chiude le connessioni fisiche del pool, senza prenderle in prestito:
+        con la connessione il server libera anche gli statement preparati.
+        """
+        if self.pool:
+            self.pool.close()
+            self.pool = None
             logger.info("🔌 Connessione database chiusa")
     
+    @contextmanager
+    def _cursor(self, **cursor_kwargs):
+        """
+        Prende in prestito una connessione dal pool per una sola operazione.
+        
+        All'uscita il cursore viene chiuso e la connessione torna al pool,
+        così più grafici possono interrogare il database in parallelo.
+        """
+        conn = self.pool.get_connection()
+        try:
+            cursor = conn.cursor(**cursor_kwargs)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        finally:
+            self.pool.release(conn)
+    
+    @contextmanager
+    def _prepared_cursor(self, query: str):
+        """
+        Prende una connessione dal pool e il suo cursore preparato per `query`.
+        
+        Ogni connessione fisica conserva i propri statement: il server analizza
+        la query una volta sola e le chiamate successive (es. un ticker dopo
+        l'altro) inviano solo i parametri. Il cursore resta aperto per il riuso;
+        se la lettura fallisce viene scartato, perché potrebbe avere righe pendenti.
+        """
+        conn = self.pool.get_connection()
+        try:
+            # Attributo impostato da _reset_statements sulla connessione fisica
+            statements = conn.visualizer_statements
+            cursor = statements.get(query)
+            if cursor is None:
+                cursor = conn.cursor(prepared=True)
+                statements[query] = cursor
+            try:
+                yield cursor
+            except Exception:
+                statements.pop(query, None)
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+                raise
+        finally:
+            self.pool.release(conn)
+    
+    def _read_dataframe(self, query: str, params: list = None,
+                        chunksize: int = READ_CHUNK_SIZE, prepared: bool = True,
+                        columns: tuple = None) -> pd.DataFrame:
+        """
+        Legge il risultato della query a blocchi di `chunksize` righe.
+        
+        Il cursore non bufferizzato lascia le righe sul server finché non vengono
+        richieste: ogni blocco diventa subito un DataFrame e i blocchi vengono
+        concatenati una sola volta alla fine, senza materializzare tutto in tuple.
+        Con prepared=False usa un cursore semplice (query che cambiano a ogni chiamata).
+        `columns` sono i nomi delle colonne quando la SELECT è fissa; altrimenti
+        vengono presi da cursor.description.
+        """
+        chunks = []
+        if prepared:
+            # mysql-connector riusa lo statement preparato solo se riceve lo stesso
+            # oggetto stringa (confronto con `is`): le query composte con += a ogni
+            # chiamata vanno internate, altrimenti ogni lettura ripete CLOSE + PREPARE
+            query = sys.intern(query)
+        cursor_context = self._prepared_cursor(query) if prepared else self._cursor()
+        with cursor_context as cursor:
+            cursor.execute(query, params or ())
+            if columns is None:
+                columns = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                chunks.append(pd.DataFrame.from_records(rows, columns=columns))
+        
+        if not chunks:
+            return pd.DataFrame()
+        df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, copy=False)
+        if 'transaction_date' in df.columns:
+            # datetime64[ns] come le date dei prezzi: searchsorted le confronta senza conversioni
+            df['transaction_date'] = pd.to_datetime(df['transaction_date']).astype('datetime64[ns]')
+        
+        # MySQL restituisce i DECIMAL come oggetti Decimal: convertiti una volta in float64,
+        # somme e dimensioni dei punti girano vettorizzate in numpy
+        decimal_columns = [col for col in DECIMAL_COLUMNS if col in df.columns]
+        if decimal_columns:
+            df[decimal_columns] = df[decimal_columns].astype(float)
+        return df
+    
+    @disk_cached('sales')
     def get_insider_sales_from_db(self, company_ticker: str, 
                                  start_date: date = None, end_date: date = None) -> pd.DataFrame:
-        """Estrae le vendite insider dal database."""
-        if not self.connection:
+        """
+        Estrae le vendite insider dal database.
+        
+        Solo le colonne usate da grafico e statistiche; i metadati completi
+        (prezzo, ruolo, filing) sono in get_insider_sales_detailed.
+        """
+        if not self.pool:
             logger.error("❌ Nessuna connessione al database")
             return pd.DataFrame()
         
@@ -75,11 +488,8 @@ class InsiderSalesVisualizer:
                 SELECT 
                     it.transaction_date,
                     it.transaction_shares,
-                    it.transaction_price,
-                    i.name as insider_name,
-                    i.title as insider_title,
-                    c.ticker as company_ticker,
-                    (it.transaction_shares * it.transaction_price) as transaction_value
+                    (it.transaction_shares * it.transaction_price) as transaction_value,
+                    i.name as insider_name
                 FROM insider_transactions it
                 JOIN insider_filings insider_f ON it.filing_id = insider_f.id
                 JOIN insiders i ON insider_f.insider_id = i.id
@@ -97,56 +507,166 @@ class InsiderSalesVisualizer:
                 query += " AND c.ticker = %s"
                 params.append(company_ticker)
             
-            if start_date:
+            if start_date and end_date:
+                query += " AND it.transaction_date BETWEEN %s AND %s"
+                params.extend([start_date, end_date])
+            elif start_date:
                 query += " AND it.transaction_date >= %s"
                 params.append(start_date)
-                
-            if end_date:
+            elif end_date:
                 query += " AND it.transaction_date <= %s"
                 params.append(end_date)
             
             query += " ORDER BY it.transaction_date DESC"
             
-            cursor = self.connection.cursor(buffered=True)
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
+            df = self._read_dataframe(query, params, columns=TRANSACTION_COLUMNS)
             
-            if not results:
+            if df.empty:
                 logger.warning("⚠️ Nessuna vendita insider trovata")
-                cursor.close()
                 return pd.DataFrame()
             
-            df = pd.DataFrame(results, columns=columns)
-            df['transaction_date'] = pd.to_datetime(df['transaction_date'])
-            df = df.dropna(subset=['transaction_shares', 'transaction_price'])
-            df = df[(df['transaction_shares'] > 0) & (df['transaction_price'] > 0)]
-            
-            logger.info(f"✅ Estratte {len(df)} vendite insider dal database")
-            cursor.close()
+            logger.info("✅ Estratte %s vendite insider dal database", len(df))
             return df
             
         except Exception as e:
             logger.error(f"❌ Errore nell'estrazione vendite insider: {e}")
             return pd.DataFrame()
     
-    def get_insider_purchases_from_db(self, company_ticker: str, 
-                                     start_date: date = None, end_date: date = None) -> pd.DataFrame:
-        """Estrae gli acquisti insider dal database."""
-        if not self.connection:
+    def get_insider_sales_for_tickers(self, tickers: List[str], start_date: date,
+                                      end_date: date) -> Dict[str, pd.DataFrame]:
+        """
+        Vendite insider di più ticker con una sola query (WHERE c.ticker IN (...)).
+        
+        Restituisce un DataFrame per ticker con le stesse colonne di
+        get_insider_sales_from_db; i ticker senza vendite hanno un DataFrame vuoto.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        result = {ticker: pd.DataFrame() for ticker in tickers}
+        if not self.pool:
+            logger.error("❌ Nessuna connessione al database")
+            return result
+        if not tickers:
+            return result
+        
+        try:
+            placeholders = ', '.join(['%s'] * len(tickers))
+            query = f"""
+                SELECT 
+                    it.transaction_date,
+                    it.transaction_shares,
+                    (it.transaction_shares * it.transaction_price) as transaction_value,
+                    i.name as insider_name,
+                    c.ticker as company_ticker
+                FROM insider_transactions it
+                JOIN insider_filings insider_f ON it.filing_id = insider_f.id
+                JOIN insiders i ON insider_f.insider_id = i.id
+                JOIN companies c ON insider_f.company_id = c.id
+                WHERE it.transaction_code = 'S'
+                  AND it.transaction_shares IS NOT NULL 
+                  AND it.transaction_price IS NOT NULL
+                  AND it.transaction_shares > 0
+                  AND it.transaction_price > 0
+                  AND c.ticker IN ({placeholders})
+                  AND it.transaction_date BETWEEN %s AND %s
+                ORDER BY it.transaction_date DESC
+            """
+            
+            # Il numero di segnaposto cambia con la lista: cursore semplice, non preparato
+            df = self._read_dataframe(query, tickers + [start_date, end_date], prepared=False,
+                                      columns=TRANSACTION_COLUMNS + ('company_ticker',))
+            if df.empty:
+                logger.warning("⚠️ Nessuna vendita insider trovata per i ticker richiesti")
+                return result
+            
+            # Il confronto di MySQL ignora le maiuscole: chiavi riportate al ticker richiesto
+            requested = {ticker.upper(): ticker for ticker in tickers}
+            for ticker, group in df.groupby('company_ticker', sort=False):
+                key = requested.get(str(ticker).upper(), ticker)
+                result[key] = group.drop(columns='company_ticker').reset_index(drop=True)
+            
+            logger.info("✅ Estratte %s vendite insider per %s ticker in una query", len(df), len(tickers))
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ Errore nell'estrazione vendite insider multi-ticker: {e}")
+            return result
+    
+    def get_insider_sales_detailed(self, company_ticker: str,
+                                   start_date: date = None, end_date: date = None) -> pd.DataFrame:
+        """
+        Estrae le vendite insider con tutti i metadati del filing (debug/ispezione).
+        
+        Il grafico usa get_insider_sales_from_db, che legge solo le colonne disegnate.
+        """
+        if not self.pool:
             logger.error("❌ Nessuna connessione al database")
             return pd.DataFrame()
         
         try:
             query = """
                 SELECT 
+                    it.id,
+                    it.filing_id,
+                    it.security_title,
                     it.transaction_date,
                     it.transaction_shares,
                     it.transaction_price,
+                    (it.transaction_shares * it.transaction_price) as transaction_value,
+                    it.shares_owned_after,
+                    it.direct_indirect,
+                    it.is_derivative,
+                    it.created_at,
+                    insider_f.accession_number,
+                    insider_f.filed_date,
+                    i.cik as insider_cik,
                     i.name as insider_name,
                     i.title as insider_title,
-                    c.ticker as company_ticker,
-                    (it.transaction_shares * it.transaction_price) as transaction_value
+                    c.cik as company_cik,
+                    c.name as company_name,
+                    c.ticker as company_ticker
+                FROM insider_transactions it
+                JOIN insider_filings insider_f ON it.filing_id = insider_f.id
+                JOIN insiders i ON insider_f.insider_id = i.id
+                JOIN companies c ON insider_f.company_id = c.id
+                WHERE it.transaction_code = 'S'
+                  AND c.ticker = %s
+            """
+            
+            params = [company_ticker]
+            
+            if start_date:
+                query += " AND it.transaction_date >= %s"
+                params.append(start_date)
+                
+            if end_date:
+                query += " AND it.transaction_date <= %s"
+                params.append(end_date)
+            
+            query += " ORDER BY it.transaction_date DESC"
+            
+            df = self._read_dataframe(query, params)
+            logger.info("✅ Estratte %s vendite insider (dettaglio completo)", len(df))
+            return df
+            
+        except Exception as e:
+            logger.error(f"❌ Errore nell'estrazione dettagliata vendite insider: {e}")
+            return pd.DataFrame()
+    
+    @disk_cached('purchases')
+    def get_insider_purchases_from_db(self, company_ticker: str, 
+                                     start_date: date = None, end_date: date = None) -> pd.DataFrame:
+        """Estrae gli acquisti insider dal database (stesse colonne delle vendite)."""
+        if not self.pool:
+            logger.error("❌ Nessuna connessione al database")
+            return pd.DataFrame()
+        
+        try:
+            query = """
+                SELECT 
+                    it.transaction_date,
+                    it.transaction_shares,
+                    (it.transaction_shares * it.transaction_price) as transaction_value,
+                    i.name as insider_name
                 FROM insider_transactions it
                 JOIN insider_filings insider_f ON it.filing_id = insider_f.id
                 JOIN insiders i ON insider_f.insider_id = i.id
@@ -164,148 +684,610 @@ class InsiderSalesVisualizer:
                 query += " AND c.ticker = %s"
                 params.append(company_ticker)
             
-            if start_date:
+            if start_date and end_date:
+                query += " AND it.transaction_date BETWEEN %s AND %s"
+                params.extend([start_date, end_date])
+            elif start_date:
                 query += " AND it.transaction_date >= %s"
                 params.append(start_date)
-                
-            if end_date:
+            elif end_date:
                 query += " AND it.transaction_date <= %s"
                 params.append(end_date)
             
             query += " ORDER BY it.transaction_date DESC"
             
-            cursor = self.connection.cursor(buffered=True)
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
+            df = self._read_dataframe(query, params, columns=TRANSACTION_COLUMNS)
             
-            if not results:
+            if df.empty:
                 logger.warning("⚠️ Nessun acquisto insider trovato")
-                cursor.close()
                 return pd.DataFrame()
             
-            df = pd.DataFrame(results, columns=columns)
-            df['transaction_date'] = pd.to_datetime(df['transaction_date'])
-            df = df.dropna(subset=['transaction_shares', 'transaction_price'])
-            df = df[(df['transaction_shares'] > 0) & (df['transaction_price'] > 0)]
-            
-            logger.info(f"✅ Estratti {len(df)} acquisti insider dal database")
-            cursor.close()
+            logger.info("✅ Estratti %s acquisti insider dal database", len(df))
             return df
             
         except Exception as e:
             logger.error(f"❌ Errore nell'estrazione acquisti insider: {e}")
             return pd.DataFrame()
     
+    def get_daily_transactions_from_db(self, company_ticker: str,
+                                       start_date: date = None, end_date: date = None) -> pd.DataFrame:
+        """
+        Estrae il valore giornaliero di vendite e acquisti già aggregato dal database.
+        
+        Il GROUP BY gira sul server: arriva una riga per giorno e tipo invece di
+        ogni singola transazione. Gli acquisti hanno valore negativo per il grafico.
+        """
+        if not self.pool:
+            logger.error("❌ Nessuna connessione al database")
+            return pd.DataFrame()
+        
+        try:
+            query = """
+                SELECT 
+                    it.transaction_date,
+                    IF(it.transaction_code = 'S', 'sale', 'purchase') as transaction_type,
+                    SUM(IF(it.transaction_code = 'S', 1, -1)
+                        * it.transaction_shares * it.transaction_price) as transaction_value,
+                    COUNT(*) as transaction_count
+                FROM insider_transactions it
+                JOIN insider_filings insider_f ON it.filing_id = insider_f.id
+                JOIN companies c ON insider_f.company_id = c.id
+                WHERE it.transaction_code IN ('S', 'P')
+                  AND it.transaction_shares IS NOT NULL 
+                  AND it.transaction_price IS NOT NULL
+                  AND it.transaction_shares > 0
+                  AND it.transaction_price > 0
+            """
+            
+            params = []
+            
+            if company_ticker:
+                query += " AND c.ticker = %s"
+                params.append(company_ticker)
+            
+            if start_date and end_date:
+                query += " AND it.transaction_date BETWEEN %s AND %s"
+                params.extend([start_date, end_date])
+            elif start_date:
+                query += " AND it.transaction_date >= %s"
+                params.append(start_date)
+            elif end_date:
+                query += " AND it.transaction_date <= %s"
+                params.append(end_date)
+            
+            query += " GROUP BY it.transaction_date, transaction_type ORDER BY it.transaction_date"
+            
+            return self._read_dataframe(query, params)
+            
+        except Exception as e:
+            logger.error(f"❌ Errore nell'aggregazione giornaliera transazioni: {e}")
+            return pd.DataFrame()
+    
+    def get_top_insiders(self, company_ticker: str, n: int = 5,
+                         transaction_code: str = 'S') -> pd.DataFrame:
+        """Restituisce i primi n insider per valore totale delle transazioni (default: vendite)."""
+        if not self.pool:
+            logger.error("❌ Nessuna connessione al database")
+            return pd.DataFrame()
+        
+        try:
+            query = """
+                SELECT 
+                    i.name as insider_name,
+                    i.title as insider_title,
+                    SUM(it.transaction_shares * it.transaction_price) as transaction_value,
+                    SUM(it.transaction_shares) as transaction_shares,
+                    COUNT(*) as transaction_count
+                FROM insider_transactions it
+                JOIN insider_filings insider_f ON it.filing_id = insider_f.id
+                JOIN insiders i ON insider_f.insider_id = i.id
+                JOIN companies c ON insider_f.company_id = c.id
+                WHERE it.transaction_code = %s
+                  AND c.ticker = %s
+                  AND it.transaction_shares > 0
+                  AND it.transaction_price > 0
+                GROUP BY i.name, i.title
+                ORDER BY transaction_value DESC
+                LIMIT %s
+            """
+            
+            return self._read_dataframe(query, [transaction_code, company_ticker, n])
+            
+        except Exception as e:
+            logger.error(f"❌ Errore nel recupero top insider: {e}")
+            return pd.DataFrame()
+    
+    def _read_price_table(self, query: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Legge la serie prezzi; con connectorx direttamente in buffer colonnari Arrow.
+        
+        connectorx non accetta parametri: le date (oggetti date, non input libero)
+        vengono scritte nella query, il nome tabella è già validato da _price_table.
+        Le colonne numeriche arrivano come array float64 senza un oggetto Python
+        per cella. Senza connectorx, o se fallisce, si usa il cursore MySQL.
+        """
+        if cx is not None:
+            try:
+                literal_query = query % (f"'{start_date.isoformat()}'", f"'{end_date.isoformat()}'")
+                return cx.read_sql(mysql_uri(self.db_config), literal_query, return_type="arrow").to_pandas()
+            except Exception as e:
+                logger.warning(f"⚠️ Lettura connectorx fallita, uso il cursore MySQL: {e}")
+        
+        # Il nome tabella cambia per ticker: cursore semplice, non preparato. Uno
+        # statement preparato per tabella e connessione resterebbe allocato sul
+        # server per tutta la sessione (limite globale max_prepared_stmt_count)
+        return self._read_dataframe(query, [start_date, end_date], prepared=False, columns=PRICE_COLUMNS)
+    
+    def _read_price_range(self, query: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """Legge un intervallo della serie prezzi con Date in datetime64[ns] e Close in float64."""
+        df = self._read_price_table(query, start_date, end_date)
+        if df.empty:
+            return pd.DataFrame(columns=list(PRICE_COLUMNS))
+        
+        # Converte la data una volta sola nel formato usato dal grafico
+        df['Date'] = _normalize_dates(df['Date'])
+        
+        # Prezzi numerici: DECIMAL in float64 con un solo cast; to_numeric solo
+        # per le colonne non convertibili direttamente (es. testo). Le colonne
+        # già float64 (connectorx) restano come sono, senza copia
+        if df['Close'].dtype != np.float64:
+            try:
+                df['Close'] = df['Close'].astype(np.float64)
+            except (TypeError, ValueError):
+                df['Close'] = pd.to_numeric(df['Close'], errors='coerce')
+        return df
+    
+    def _read_prices_incremental(self, ticker: str, query: str,
+                                 start_date: date, end_date: date) -> pd.DataFrame:
+        """
+        Serie prezzi del periodo, leggendo dal database solo i giorni non ancora salvati.
+        
+        Le righe già lette restano in PRICE_STORE_DIR/<TICKER>.parquet insieme al
+        periodo coperto (attrs del DataFrame). Si interrogano solo i tratti mancanti
+        prima e dopo. La copertura finisce all'ultima data effettivamente presente:
+        i giorni richiesti ma non ancora caricati in MySQL (es. la chiusura di
+        venerdì caricata lunedì) vengono richiesti di nuovo, e l'ultimo giorno
+        viene riletto se è oggi. Il periodo coperto resta contiguo.
+        """
+        if not self.use_disk_cache:
+            return self._read_price_range(query, start_date, end_date)
+        
+        path = os.path.join(PRICE_STORE_DIR, f"{ticker}.parquet")
+        stored, covered = None, None
+        if os.path.exists(path):
+            try:
+                stored = pd.read_parquet(path)
+                covered = (date.fromisoformat(stored.attrs['covered_start']),
+                           date.fromisoformat(stored.attrs['covered_end']))
+            except Exception as e:
+                logger.warning(f"⚠️ Archivio prezzi di {ticker} illeggibile, nuova lettura: {e}")
+                stored, covered = None, None
+        
+        if covered is None:
+            ranges = [(start_date, end_date)]
+            covered_start = start_date
+        else:
+            ranges = []
+            if start_date < covered[0]:
+                ranges.append((start_date, covered[0]))
+            if end_date > covered[1] or end_date == covered[1] >= date.today():
+                ranges.append((covered[1], end_date))
+            covered_start = min(start_date, covered[0])
+        
+        if ranges:
+            pieces = [self._read_price_range(query, start, end) for start, end in ranges]
+            if stored is not None:
+                pieces.insert(0, stored)
+            pieces = [piece for piece in pieces if not piece.empty]
+            if not pieces:
+                # Nessun prezzo nel database: niente da salvare, la prossima volta si rilegge
+                return pd.DataFrame(columns=list(PRICE_COLUMNS))
+            stored = (pd.concat(pieces, ignore_index=True)
+                      .drop_duplicates(subset='Date', keep='last')
+                      .sort_values('Date', ignore_index=True))
+            # Fine copertura = ultima data restituita, non la data richiesta
+            covered_end = stored['Date'].iloc[-1].date()
+            stored.attrs = {'covered_start': covered_start.isoformat(),
+                            'covered_end': covered_end.isoformat()}
+            _write_parquet_atomic(path, stored)
+            logger.info("💾 Archivio prezzi di %s aggiornato (%s tratti letti dal database)", ticker, len(ranges))
+        else:
+            logger.info("💾 Prezzi di %s letti dall'archivio locale: %s", ticker, path)
+        
+        if stored.empty:
+            return stored
+        dates = stored['Date']
+        in_period = (dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))
+        return stored[in_period].reset_index(drop=True)
+    
     def get_stock_price_data(self, ticker: str, start_date: date, end_date: date) -> pd.DataFrame:
         """
         Recupera i dati storici del prezzo del titolo DIRETTAMENTE DAL DATABASE.
         Usa la tabella sidan.{TICKER} invece di Yahoo Finance.
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("❌ Nessuna connessione al database")
             return pd.DataFrame()
             
         try:
-            logger.info(f"📈 Recupero dati storici per {ticker} dal DATABASE...")
+            logger.info("📈 Recupero dati storici per %s dal DATABASE...", ticker)
+            
+            # Nome tabella dinamico basato sul ticker (validato)
+            table_name = _price_table(ticker)
+            if not self._has_price_table(ticker):
+                logger.warning(f"⚠️ Tabella {table_name} non presente nello schema prezzi")
+                return self._price_fallback(ticker, start_date, end_date)
             
-            # Nome tabella dinamico basato sul ticker
-            table_name = f"sidan.{ticker}"
+            self._ensure_date_index(ticker, table_name)
             
-            # Query per recuperare i dati storici
+            # Il grafico usa solo la chiusura: Open/High/Low/Volume non vengono trasferiti
             query = f"""
-                SELECT 
-                    Date,
-                    Open,
-                    High,
-                    Low,
-                    Close,
-                    Volume
+                SELECT {', '.join(PRICE_COLUMNS)}
                 FROM {table_name}
-                WHERE Date >= %s AND Date <= %s
-                ORDER BY Date ASC
+                WHERE Date BETWEEN %s AND %s
+                ORDER BY Date
             """
             
-            cursor = self.connection.cursor(buffered=True)
-            cursor.execute(query, (start_date, end_date))
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
+            df = self._read_prices_incremental(ticker, query, start_date, end_date)
             
-            if not results:
+            if df.empty:
                 logger.warning(f"⚠️ Nessun dato storico trovato in {table_name}")
-                cursor.close()
-                # FALLBACK: Prova Yahoo Finance se la tabella è vuota
-                logger.info("🔄 Fallback a Yahoo Finance...")
-                return self._get_stock_price_data_fallback(ticker, start_date, end_date)
-            
-            # Crea DataFrame
-            df = pd.DataFrame(results, columns=columns)
-            
-            # Converte la data se necessario
-            if not pd.api.types.is_datetime64_any_dtype(df['Date']):
-                df['Date'] = pd.to_datetime(df['Date'])
-            
-            # Assicurati che i prezzi siano numerici
-            price_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            for col in price_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                return self._price_fallback(ticker, start_date, end_date)
             
             # Rimuovi righe con valori NaN nei prezzi essenziali
             df = df.dropna(subset=['Close'])
+            if df.empty:
+                logger.warning(f"⚠️ Nessun prezzo valido in {table_name}")
+                return self._price_fallback(ticker, start_date, end_date)
             
-            logger.info(f"✅ Recuperati {len(df)} giorni di dati per {ticker} dal database")
-            logger.info(f"   Periodo: {df['Date'].min().date()} - {df['Date'].max().date()}")
+            logger.info("✅ Recuperati %s giorni di dati per %s dal database", len(df), ticker)
+            # Righe già ordinate per data: estremi del periodo senza scansione
+            logger.info("   Periodo: %s - %s", df['Date'].iloc[0].date(), df['Date'].iloc[-1].date())
             
-            cursor.close()
             return df
             
         except Exception as e:
             logger.error(f"❌ Errore nel recupero dati storici dal database per {ticker}: {e}")
-            logger.info("🔄 Tentativo fallback a Yahoo Finance...")
-            return self._get_stock_price_data_fallback(ticker, start_date, end_date)
+            return self._price_fallback(ticker, start_date, end_date)
+    
+    def _price_fallback(self, ticker: str, start_date: date, end_date: date) -> pd.DataFrame:
+        """Prezzi da Yahoo Finance se allow_yf_fallback è attivo, altrimenti nessun dato (niente rete)."""
+        if not self.allow_yf_fallback:
+            logger.info("ℹ️ Fallback Yahoo Finance disattivato (allow_yf_fallback=False)")
+            return pd.DataFrame()
+        logger.info("🔄 Fallback a Yahoo Finance...")
+        return self._get_stock_price_data_fallback(ticker, start_date, end_date)
     
     def _get_stock_price_data_fallback(self, ticker: str, start_date: date, end_date: date) -> pd.DataFrame:
         """
         Fallback a Yahoo Finance se i dati non sono disponibili nel database.
         """
         try:
-            logger.info(f"📈 FALLBACK: Recupero dati da Yahoo Finance per {ticker}...")
+            logger.info("📈 FALLBACK: Recupero dati da Yahoo Finance per %s...", ticker)
             
-            stock = yf.Ticker(ticker)
             extended_start = start_date - timedelta(days=5)
-            hist_data = stock.history(start=extended_start, end=end_date + timedelta(days=1), interval='1d')
+            history_end = end_date + timedelta(days=1)
+            
+            cache_path = self._price_cache_path(ticker, extended_start, history_end)
+            hist_data = self._read_price_cache(cache_path, end_date)
+            if hist_data is None:
+                hist_data = self._fetch_history_coalesced(ticker, extended_start, history_end)
+                if not hist_data.empty:
+                    self._write_price_cache(cache_path, hist_data)
             
             if hist_data.empty:
                 logger.error(f"❌ Nessun dato storico trovato per {ticker} anche su Yahoo Finance")
                 return pd.DataFrame()
             
             hist_data.reset_index(inplace=True)
-            hist_data = hist_data[hist_data['Date'] >= pd.to_datetime(start_date)]
+            hist_data['Date'] = _normalize_dates(hist_data['Date'])
+            hist_data = hist_data[hist_data['Date'] >= pd.Timestamp(start_date)]
             
-            logger.info(f"✅ FALLBACK: Recuperati {len(hist_data)} giorni da Yahoo Finance")
+            logger.info("✅ FALLBACK: Recuperati %s giorni da Yahoo Finance", len(hist_data))
             return hist_data
                 
         except Exception as e:
             logger.error(f"❌ Errore anche nel fallback Yahoo Finance per {ticker}: {e}")
             return pd.DataFrame()
-    def create_insider_sales_chart_FIXED(self, ticker: str, days_back: int = 1825) -> None:
+    
+    def get_stock_price_data_bulk(self, tickers: List[str], start_date: date,
+                                  end_date: date) -> Dict[str, pd.DataFrame]:
+        """
+        Prezzi Yahoo Finance di più ticker con un solo yf.download.
+        
+        Scarica in parallelo (threads=True) solo i ticker non già in cache e salva
+        ogni serie nella stessa cache del fallback: le chiamate successive a
+        _get_stock_price_data_fallback per questi ticker non vanno più in rete.
+        """
+        extended_start = start_date - timedelta(days=5)
+        history_end = end_date + timedelta(days=1)
+        
+        missing = [ticker for ticker in dict.fromkeys(tickers)
+                   if self._read_price_cache(self._price_cache_path(ticker, extended_start, history_end),
+                                             end_date) is None]
+        
+        if missing:
+            logger.info("📈 Download Yahoo Finance di %s ticker in un'unica richiesta...", len(missing))
+            data = pd.DataFrame()
+            for attempt in range(1, YF_MAX_ATTEMPTS + 1):
+                try:
+                    data = yf.download(missing, start=extended_start, end=history_end, interval='1d',
+                                       group_by='ticker', threads=True, progress=False,
+                                       session=_YF_SESSION)
+                    break
+                except Exception as e:
+                    if attempt == YF_MAX_ATTEMPTS or not _is_rate_limited(e):
+                        logger.error(f"❌ Errore nel download Yahoo Finance multiplo: {e}")
+                        break
+                    wait = random.uniform(3, 5)
+                    logger.warning(f"⚠️ Rate limit Yahoo Finance, nuovo tentativo tra {wait:.1f}s")
+                    time.sleep(wait)
+            
+            if not data.empty:
+                for ticker in missing:
+                    if isinstance(data.columns, pd.MultiIndex):
+                        if ticker not in data.columns.get_level_values(0):
+                            continue
+                        hist_data = data[ticker]
+                    else:
+                        hist_data = data
+                    hist_data = hist_data.dropna(how='all')
+                    if not hist_data.empty:
+                        self._write_price_cache(
+                            self._price_cache_path(ticker, extended_start, history_end), hist_data)
+        
+        return {ticker: self._get_stock_price_data_fallback(ticker, start_date, end_date)
+                for ticker in dict.fromkeys(tickers)}
+    
+    def _fetch_history_coalesced(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        """
+        Scarica la storia dei prezzi condividendo i download già in corso.
+        
+        Il primo chiamante per (ticker, start, end) esegue la richiesta; quelli
+        concorrenti attendono il suo Future e ricevono lo stesso DataFrame.
+        """
+        key = (ticker, start, end)
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                _INFLIGHT[key] = future
+        
+        if is_owner:
+            try:
+                future.set_result(self._download_history(ticker, start, end))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with _INFLIGHT_LOCK:
+                    _INFLIGHT.pop(key, None)
+        
+        return future.result()
+    
+    def _download_history(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        """Scarica la storia giornaliera; sul rate limit riprova dopo un'attesa casuale di 3-5 s."""
+        for attempt in range(1, YF_MAX_ATTEMPTS + 1):
+            try:
+                stock = yf.Ticker(ticker, session=_YF_SESSION)
+                return stock.history(start=start, end=end, interval='1d')
+            except Exception as e:
+                if attempt == YF_MAX_ATTEMPTS or not _is_rate_limited(e):
+                    raise
+                wait = random.uniform(3, 5)
+                logger.warning(f"⚠️ Rate limit Yahoo Finance per {ticker}, nuovo tentativo tra {wait:.1f}s")
+                time.sleep(wait)
+    
+    def _load_chart_data(self, ticker: str, start_date: date, end_date: date,
+                         parallel: bool = True) -> tuple:
+        """
+        Carica vendite, acquisti, aggregato giornaliero e prezzi di un ticker.
+        
+        Le letture sono indipendenti e, con parallel=True, vengono eseguite
+        in contemporanea, ciascuna su una propria connessione del pool.
+        """
+        loaders = (self.get_insider_sales_from_db, self.get_insider_purchases_from_db,
+                   self.get_daily_transactions_from_db, self.get_stock_price_data)
+        if not parallel:
+            return tuple(load(ticker, start_date, end_date) for load in loaders)
+        
+        with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+            futures = [executor.submit(load, ticker, start_date, end_date) for load in loaders]
+            return tuple(future.result() for future in futures)
+    
+    def prefetch_chart_data(self, tickers: List[str], days_back: int = 1825) -> None:
+        """
+        Carica in parallelo i dati dei grafici di più ticker.
+        
+        Il lavoro è I/O (MySQL e Yahoo Finance), quindi i thread lavorano davvero
+        in parallelo; create_insider_sales_chart_FIXED riusa poi i dati caricati.
+        Le vendite di tutti i ticker arrivano con una sola query.
+        Il disegno resta nel thread principale perché matplotlib non è thread-safe.
+        """
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days_back)
+        sales_by_ticker = self.get_insider_sales_for_tickers(tickers, start_date, end_date)
+        
+        # Ogni ticker usa una connessione alla volta: i worker non superano il pool
+        workers = max(1, min(PREFETCH_WORKERS, POOL_SIZE, len(tickers)))
+        
+        def _process(ticker: str) -> tuple:
+            purchases_df, daily_transactions, price_df = (
+                load(ticker, start_date, end_date)
+                for load in (self.get_insider_purchases_from_db, self.get_daily_transactions_from_db,
+                             self.get_stock_price_data))
+            return ticker, (sales_by_ticker[ticker], purchases_df, daily_transactions, price_df)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for ticker, chart_data in executor.map(_process, tickers):
+                self._prefetched[(ticker, start_date, end_date)] = chart_data
+        
+        logger.info("✅ Dati caricati in anticipo per %s ticker", len(tickers))
+    
+    def _price_cache_path(self, ticker: str, start: date, end: date, interval: str = '1d') -> str:
+        """Percorso del file di cache per (ticker, start, end, interval)."""
+        key = f"{ticker}|{start}|{end}|{interval}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return _cache_path(PRICE_CACHE_DIR, '', ticker, digest)
+    
+    def _read_price_cache(self, path: str, end_date: date) -> Optional[pd.DataFrame]:
+        """Legge i prezzi dalla cache; None se assenti, scaduti o illeggibili."""
+        if not os.path.exists(path):
+            return None
+        
+        # Un periodo che arriva a oggi può ancora ricevere la chiusura di giornata
+        if end_date >= date.today() and time.time() - os.path.getmtime(path) > PRICE_CACHE_TTL:
+            return None
+        
+        try:
+            hist_data = pd.read_parquet(path)
+            logger.info("💾 Dati Yahoo Finance letti dalla cache: %s", path)
+            return hist_data
+        except Exception as e:
+            logger.warning(f"⚠️ Cache prezzi illeggibile, nuovo download: {e}")
+            return None
+    
+    def _write_price_cache(self, path: str, hist_data: pd.DataFrame) -> None:
+        """Salva i prezzi scaricati nella cache su disco (errori solo segnalati)."""
+        _write_parquet_atomic(path, hist_data)
+    
+    def _closest_price_indices(self, transaction_dates: np.ndarray, price_dates: np.ndarray) -> np.ndarray:
+        """
+        Indice dell'ultima chiusura disponibile alla data di ogni transazione (-1 se nessuna).
+        
+        I prezzi arrivano già ordinati per data (ORDER BY Date / Yahoo Finance), quindi
+        basta una ricerca binaria vettorizzata, senza ordinare o unire DataFrame.
+        Le date sono già normalizzate da _read_dataframe e get_stock_price_data.
+        """
+        return np.searchsorted(price_dates, transaction_dates, side='right') - 1
+    
+    def _scatter_transactions(self, ax, transactions_df: pd.DataFrame, price_dates: np.ndarray,
+                              price_closes: np.ndarray, color: str, edgecolor: str) -> int:
+        """
+        Disegna tutte le transazioni con una sola scatter e restituisce il numero di punti.
+        
+        Le colonne vengono estratte una volta in array; i prezzi arrivano già come
+        array (date e chiusure) estratti dal chiamante per tutte le serie del grafico.
+        """
+        transaction_dates = transactions_df['transaction_date'].to_numpy()
+        transaction_values = transactions_df['transaction_value'].to_numpy(dtype=np.float64)
+        price_idx = self._closest_price_indices(transaction_dates, price_dates)
+        
+        # Scarta le transazioni precedenti al primo prezzo o senza chiusura valida
+        closes = np.full(len(price_idx), np.nan)
+        has_price = price_idx >= 0
+        closes[has_price] = price_closes[price_idx[has_price]]
+        valid = ~np.isnan(closes)
+        if not valid.any():
+            return 0
+        
+        # Dimensione del punto proporzionale al valore della transazione (30-200)
+        point_sizes = np.clip(transaction_values[valid] / 1000000 * 50, 30, 200)
+        ax.scatter(transaction_dates[valid], closes[valid],
+                   s=point_sizes, color=color, alpha=0.7,
+                   edgecolors=edgecolor, linewidth=1, zorder=5)
+        return int(valid.sum())
+    
+    def _flush_canvas(self, fig) -> None:
+        """
+        Disegna la figura ed elabora gli eventi GUI in sospeso, senza attese fisse.
+        
+        plt.pause(1-2) dormiva comunque per l'intera durata; qui il disegno è
+        sincrono e basta un singolo giro del ciclo eventi perché la finestra appaia.
+        """
+        fig.canvas.draw_idle()
+        fig.canvas.flush_events()
+    
+    def _chart_axes(self, reuse: bool = False, with_volume: bool = True) -> tuple:
+        """
+        Restituisce figura e assi (prezzo, volume giornaliero) del grafico.
+        
+        Senza transazioni (with_volume=False) il pannello del volume non viene
+        creato: la figura ha solo l'asse del prezzo, più bassa, e ax2 è None.
+        
+        Con reuse=True (grafico solo da salvare) la figura è un Figure con canvas
+        Agg proprio, fuori da pyplot: nessun backend GUI né stato globale, e la
+        figura già creata viene solo svuotata al ticker successivo. Altrimenti la
+        figura precedente viene chiusa e pyplot ne crea una da mostrare in finestra.
+        L'asse x è condiviso (formatter impostati una volta su ax2) e il layout
+        vincolato è calcolato in un solo passaggio al momento del disegno.
+        """
+        figsize = (16, 12) if with_volume else (16, 8)
+        # Le figure fuori da pyplot non hanno un manager di finestra
+        offscreen = self._fig is not None and self._fig.canvas.manager is None
+        if reuse and offscreen:
+            self._fig.clear()
+            self._fig.set_size_inches(*figsize)
+        else:
+            # Solo la figura del grafico precedente: nessuna scansione di tutte le figure aperte
+            if self._fig is not None and not offscreen:
+                plt.close(self._fig)
+            if reuse:
+                self._fig = Figure(figsize=figsize, constrained_layout=True)
+                FigureCanvasAgg(self._fig)
+            else:
+                self._fig = plt.figure(figsize=figsize, constrained_layout=True)
+        
+        if not with_volume:
+            return self._fig, self._fig.subplots(), None
+        
+        ax1, ax2 = self._fig.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+        return self._fig, ax1, ax2
+    
+    def _save_in_background(self, fig, save_path: str, dpi: int, save_kwargs: Dict[str, Any]) -> None:
+        """
+        Salva la figura in un processo separato e ritorna subito.
+        
+        La figura viene serializzata così com'è adesso: il chiamante può ripulirla
+        e disegnare il ticker successivo mentre il figlio codifica il PNG.
+        matplotlib non è thread-safe, ma processi distinti non condividono nulla.
+        """
+        payload = pickle.dumps(fig)
+        process = multiprocessing.Process(target=_save_figure_worker,
+                                          args=(payload, save_path, dpi, save_kwargs))
+        process.start()
+        self._save_processes = [p for p in self._save_processes if p.is_alive()]
+        self._save_processes.append(process)
+        logger.info("💾 Salvataggio in background avviato: %s", save_path)
+    
+    def wait_for_saves(self) -> None:
+        """Attende la fine dei salvataggi in background ancora in corso."""
+        for process in self._save_processes:
+            process.join()
+            if process.exitcode != 0:
+                logger.error(f"❌ Salvataggio in background fallito (exit code {process.exitcode})")
+        self._save_processes = []
+    
+    def close_figure(self) -> None:
+        """Chiude la figura dell'ultimo grafico (attende i salvataggi in corso)."""
+        self.wait_for_saves()
+        if self._fig is not None:
+            if self._fig.canvas.manager is not None:
+                plt.close(self._fig)
+            self._fig = None
+    
+    def create_insider_sales_chart_FIXED(self, ticker: str, days_back: int = 1825,
+                                         show: bool = True, save_path: Optional[str] = None,
+                                         dpi: int = 150) -> None:
         """
         VERSIONE COMPLETA che mostra SALES (rosso) e PURCHASES (verde) individuali.
-        SOLO VISUALIZZAZIONE - NON SALVA FILE
+        Di default SOLO VISUALIZZAZIONE - NON SALVA FILE. Con save_path il grafico viene
+        salvato (dpi 150 salvo richiesta); con show=False non si apre alcuna finestra e
+        la stessa figura viene ripulita e riusata dal grafico successivo.
         """
         try:
             # Calcola periodo
             end_date = date.today()
             start_date = end_date - timedelta(days=days_back)
             
-            logger.info(f"📊 Creazione grafico COMPLETO per {ticker}")
-            logger.info(f"   Periodo: {start_date} - {end_date}")
+            logger.info("📊 Creazione grafico COMPLETO per %s", ticker)
+            logger.info("   Periodo: %s - %s", start_date, end_date)
             
-            # 1. Recupera dati
-            sales_df = self.get_insider_sales_from_db(ticker, start_date, end_date)
-            purchases_df = self.get_insider_purchases_from_db(ticker, start_date, end_date)
-            price_df = self.get_stock_price_data(ticker, start_date, end_date)
+            # 1. Recupera dati (già pronti se caricati con prefetch_chart_data)
+            chart_data = self._prefetched.pop((ticker, start_date, end_date), None)
+            if chart_data is None:
+                chart_data = self._load_chart_data(ticker, start_date, end_date)
+            sales_df, purchases_df, daily_transactions, price_df = chart_data
             
             # VERIFICA PRELIMINARE: Controlla se ci sono dati sufficienti
             if price_df.empty and sales_df.empty and purchases_df.empty:
@@ -325,76 +1307,38 @@ class InsiderSalesVisualizer:
                 print(f"   Verifica che esista la tabella sidan.{ticker}")
                 return
             
-            # 2. FORZA chiusura di eventuali figure esistenti
-            plt.close('all')
-            
-            # 3. Crea il grafico con configurazione specifica per la visualizzazione
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 12), 
-                                        gridspec_kw={'height_ratios': [3, 1]})
-            
-            # 4. Plotta prezzo
-            ax1.plot(price_df['Date'], price_df['Close'], 
+            # La ricerca binaria dei prezzi richiede date crescenti: verifica O(M),
+            # riordino solo se una sorgente li restituisse fuori ordine
+            if not price_df['Date'].is_monotonic_increasing:
+                price_df = price_df.sort_values('Date', ignore_index=True)
+            
+            # 2-3. Figura e assi: senza finestra si riusa la figura del grafico precedente
+            fig, ax1, ax2 = self._chart_axes(reuse=not show, with_volume=not daily_transactions.empty)
+            
+            # 4. Plotta prezzo (serie ridotta con LTTB oltre PRICE_PLOT_MAX_POINTS punti;
+            #    i punti insider usano comunque le chiusure complete di price_df)
+            price_dates = price_df['Date'].to_numpy()
+            price_closes = price_df['Close'].to_numpy(dtype=float)
+            keep = _lttb_indices(price_dates.astype('datetime64[ns]').astype(np.int64).astype(float),
+                                 price_closes, PRICE_PLOT_MAX_POINTS)
+            ax1.plot(price_dates[keep], price_closes[keep], 
                     color='blue', linewidth=1.5, label=f'{ticker} Prezzo Chiusura')
             
             # 5. VENDITE INSIDER (PUNTI ROSSI) - OGNI singola vendita
             sale_points_added = 0
             if not sales_df.empty:
-                logger.info(f"🔴 Processamento di {len(sales_df)} vendite individuali...")
-                
-                for idx, sale in sales_df.iterrows():
-                    sale_date = sale['transaction_date']
-                    
-                    # Trova il prezzo più vicino alla data della vendita
-                    price_mask = price_df['Date'] <= sale_date
-                    if price_mask.any():
-                        closest_price = price_df[price_mask].iloc[-1]['Close']
-                        
-                        # Calcola dimensione del punto basata sul valore della transazione
-                        transaction_value = float(sale['transaction_value'])
-                        point_size = min(200, max(30, transaction_value / 1000000 * 50))
-                        
-                        # Converti a valori scalari
-                        plot_date = pd.to_datetime(sale_date)
-                        plot_price = float(closest_price)
-                        
-                        # Plotta il punto per questa specifica vendita
-                        ax1.scatter(plot_date, plot_price, 
-                                s=float(point_size), color='red', alpha=0.7, 
-                                edgecolors='darkred', linewidth=1, zorder=5)
-                        
-                        sale_points_added += 1
-                
-                logger.info(f"✅ Aggiunti {sale_points_added} punti vendita sul grafico")
+                logger.info("🔴 Processamento di %s vendite individuali...", len(sales_df))
+                sale_points_added = self._scatter_transactions(ax1, sales_df, price_dates, price_closes,
+                                                               'red', 'darkred')
+                logger.info("✅ Aggiunti %s punti vendita sul grafico", sale_points_added)
             
             # 6. ACQUISTI INSIDER (PUNTI VERDI) - OGNI singolo acquisto
             purchase_points_added = 0
             if not purchases_df.empty:
-                logger.info(f"🟢 Processamento di {len(purchases_df)} acquisti individuali...")
-                
-                for idx, purchase in purchases_df.iterrows():
-                    purchase_date = purchase['transaction_date']
-                    
-                    # Trova il prezzo più vicino alla data dell'acquisto
-                    price_mask = price_df['Date'] <= purchase_date
-                    if price_mask.any():
-                        closest_price = price_df[price_mask].iloc[-1]['Close']
-                        
-                        # Calcola dimensione del punto basata sul valore della transazione
-                        transaction_value = float(purchase['transaction_value'])
-                        point_size = min(200, max(30, transaction_value / 1000000 * 50))
-                        
-                        # Converti a valori scalari
-                        plot_date = pd.to_datetime(purchase_date)
-                        plot_price = float(closest_price)
-                        
-                        # Plotta il punto per questo specifico acquisto
-                        ax1.scatter(plot_date, plot_price, 
-                                s=float(point_size), color='green', alpha=0.7, 
-                                edgecolors='darkgreen', linewidth=1, zorder=5)
-                        
-                        purchase_points_added += 1
-                
-                logger.info(f"✅ Aggiunti {purchase_points_added} punti acquisto sul grafico")
+                logger.info("🟢 Processamento di %s acquisti individuali...", len(purchases_df))
+                purchase_points_added = self._scatter_transactions(ax1, purchases_df, price_dates, price_closes,
+                                                                   'green', 'darkgreen')
+                logger.info("✅ Aggiunti %s punti acquisto sul grafico", purchase_points_added)
             
             # 7. Crea il titolo con statistiche complete
             total_transactions = sale_points_added + purchase_points_added
@@ -418,10 +1362,6 @@ class InsiderSalesVisualizer:
             ax1.set_title('\n'.join(title_parts), fontsize=14, weight='bold')
             
             # 8. Formattazione asse principale
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-            ax1.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
-            plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
-            
             ax1.set_ylabel('Prezzo ($)', fontsize=12)
             
             # Legenda con colori
@@ -438,103 +1378,73 @@ class InsiderSalesVisualizer:
             ax1.legend(handles=legend_elements, loc='upper left')
             ax1.grid(True, alpha=0.3)
             
-            # 9. Secondo grafico: volume transazioni GIORNALIERO (vendite e acquisti combinati)
-            if not sales_df.empty or not purchases_df.empty:
-                # Combina vendite e acquisti per il grafico giornaliero
-                all_transactions = []
+            # 9. Secondo grafico: volume transazioni GIORNALIERO (aggregato dal database),
+            #    presente solo se nel periodo ci sono transazioni
+            if ax2 is not None:
+                # Plotta vendite (rosso, positivo)
+                sales_daily_agg = daily_transactions[daily_transactions['transaction_type'] == 'sale']
+                if not sales_daily_agg.empty:
+                    ax2.bar(sales_daily_agg['transaction_date'], 
+                        sales_daily_agg['transaction_value'] / 1000000,
+                        color='red', alpha=0.6, width=1, label='Vendite')
                 
-                if not sales_df.empty:
-                    sales_daily = sales_df.copy()
-                    sales_daily['transaction_type'] = 'sale'
-                    all_transactions.append(sales_daily)
+                # Plotta acquisti (verde, negativo per distinguerli visivamente)
+                purchases_daily_agg = daily_transactions[daily_transactions['transaction_type'] == 'purchase']
+                if not purchases_daily_agg.empty:
+                    ax2.bar(purchases_daily_agg['transaction_date'], 
+                        purchases_daily_agg['transaction_value'] / 1000000,  # Già negativo
+                        color='green', alpha=0.6, width=1, label='Acquisti')
                 
-                if not purchases_df.empty:
-                    purchases_daily = purchases_df.copy()
-                    purchases_daily['transaction_type'] = 'purchase'
-                    # Per gli acquisti, rendiamo negativo il valore per distinguerli visivamente
-                    purchases_daily['transaction_value'] = -purchases_daily['transaction_value']
-                    all_transactions.append(purchases_daily)
-                
-                if all_transactions:
-                    combined_df = pd.concat(all_transactions, ignore_index=True)
-                    
-                    # Aggregazione giornaliera
-                    daily_transactions = combined_df.groupby(
-                        [combined_df['transaction_date'].dt.date, 'transaction_type']
-                    ).agg({
-                        'transaction_value': 'sum',
-                        'insider_name': 'count'
-                    }).reset_index()
-                    
-                    # Plotta vendite (rosso, positivo)
-                    sales_daily_agg = daily_transactions[daily_transactions['transaction_type'] == 'sale']
-                    if not sales_daily_agg.empty:
-                        ax2.bar(pd.to_datetime(sales_daily_agg['transaction_date']), 
-                            sales_daily_agg['transaction_value'] / 1000000,
-                            color='red', alpha=0.6, width=1, label='Vendite')
-                    
-                    # Plotta acquisti (verde, negativo per distinguerli visivamente)
-                    purchases_daily_agg = daily_transactions[daily_transactions['transaction_type'] == 'purchase']
-                    if not purchases_daily_agg.empty:
-                        ax2.bar(pd.to_datetime(purchases_daily_agg['transaction_date']), 
-                            purchases_daily_agg['transaction_value'] / 1000000,  # Già negativo
-                            color='green', alpha=0.6, width=1, label='Acquisti')
-                    
-                    ax2.set_ylabel('Valore Transazioni\nGiornaliere (M$)', fontsize=10)
-                    ax2.set_title(f'Volume Transazioni Giornaliero', fontsize=10)
-                    ax2.legend()
-                    ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)  # Linea zero
-            else:
-                ax2.text(0.5, 0.5, 'Nessuna transazione nel periodo', 
-                        transform=ax2.transAxes, ha='center', va='center')
-            
-            ax2.set_xlabel('Data', fontsize=12)
-            ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-            ax2.xaxis.set_major_locator(mdates.MonthLocator(interval=2))
-            plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
-            ax2.grid(True, alpha=0.3)
+                ax2.set_ylabel('Valore Transazioni\nGiornaliere (M$)', fontsize=10)
+                ax2.set_title(f'Volume Transazioni Giornaliero', fontsize=10)
+                ax2.legend()
+                ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)  # Linea zero
+                ax2.grid(True, alpha=0.3)
+            
+            # Asse delle date: quello in basso (condiviso con il prezzo se c'è ax2)
+            date_ax = ax2 if ax2 is not None else ax1
+            date_ax.set_xlabel('Data', fontsize=12)
+            date_ax.xaxis.set_major_formatter(mdates.DateFormatter(self.DATE_FORMAT))
+            date_ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=self.MAX_DATE_TICKS))
+            plt.setp(date_ax.xaxis.get_majorticklabels(), rotation=45)
+            
+            if show and not self.interactive:
+                # Backend Agg: nessuna finestra da mostrare, il grafico va su file
+                show = False
+                save_path = save_path or f"insider_chart_{ticker}.png"
+            
+            if save_path:
+                save_kwargs = {}
+                if save_path.lower().endswith('.png'):
+                    # zlib livello 3 senza ottimizzazione: molto più veloce del default
+                    # su grafici con ampie aree uniformi, file di poco più grandi
+                    save_kwargs['pil_kwargs'] = {'compress_level': PNG_COMPRESS_LEVEL, 'optimize': False}
+                if self.background_save:
+                    self._save_in_background(fig, save_path, dpi, save_kwargs)
+                else:
+                    _save_figure(fig, save_path, dpi, save_kwargs)
+                    logger.info("💾 Grafico salvato: %s", save_path)
             
-            plt.tight_layout()
+            if not show:
+                # La figura resta allocata per il prossimo ticker (vedi _chart_axes)
+                return
             
             # 10. VISUALIZZAZIONE SENZA SALVATAGGIO FILE
             logger.info("🖼️ Visualizzazione grafico...")
             
-            success = False
-            
-            # STRATEGIA 1: plt.show() standard
+            # Backend GUI garantito da _setup_matplotlib (senza display si salva su file):
+            # show non bloccante e un solo giro del ciclo eventi bastano a mostrare la finestra
             try:
                 plt.show(block=False)
-                plt.pause(1)
-                logger.info("✅ Strategia 1: plt.show() riuscita")
+                self._flush_canvas(fig)
                 success = True
             except Exception as e:
-                logger.warning(f"⚠️ Strategia 1 fallita: {e}")
-            
-            # STRATEGIA 2: Forzare la figura in primo piano
-            if not success:
-                try:
-                    fig.show()
-                    plt.draw()
-                    plt.pause(2)
-                    logger.info("✅ Strategia 2: fig.show() riuscita")
-                    success = True
-                except Exception as e:
-                    logger.warning(f"⚠️ Strategia 2 fallita: {e}")
-            
-            # STRATEGIA 3: Backend specifico
-            if not success:
-                try:
-                    mngr = fig.canvas.manager
-                    mngr.show()
-                    plt.pause(2)
-                    logger.info("✅ Strategia 3: canvas manager riuscita")
-                    success = True
-                except Exception as e:
-                    logger.warning(f"⚠️ Strategia 3 fallita: {e}")
+                logger.warning(f"⚠️ Visualizzazione fallita: {e}")
+                success = False
             
             # FALLBACK: Notifica che il grafico è stato creato ma potrebbe non essere visibile
             if not success:
-                logger.error("❌ Tutte le strategie di visualizzazione sono fallite")
+                logger.error("❌ Impossibile visualizzare il grafico")
                 print(f"\n⚠️ ATTENZIONE: Il grafico è stato creato ma potrebbe non essere visibile")
                 print(f"   Verifica le finestre aperte o la configurazione del display")
             else:
@@ -549,7 +1459,7 @@ class InsiderSalesVisualizer:
                 print(f"🖼️ Grafico visualizzato (nessun file salvato)")
                 print(f"{'='*60}")
                 
-                if success and plt.get_fignums():
+                if success:
                     input("\n🔍 Premi INVIO per continuare (il grafico rimarrà aperto)...")
                 else:
                     input(f"\n⚠️ Il grafico potrebbe non essere visibile. Premi INVIO per continuare...")
@@ -568,119 +1478,108 @@ class InsiderSalesVisualizer:
         Verifica se un ticker esiste nel database e restituisce informazioni sui dati disponibili.
         Restituisce un dizionario con le informazioni di disponibilità.
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("❌ Nessuna connessione al database")
             return {'exists': False, 'error': 'No database connection'}
         
         try:
-            cursor = self.connection.cursor(buffered=True)
-            result = {
-                'exists': False,
-                'company_exists': False,
-                'price_data_exists': False,
-                'insider_data_exists': False,
-                'insider_sales_count': 0,
-                'insider_purchases_count': 0,
-                'price_records': 0,
-                'date_range_insider': None,
-                'date_range_prices': None,
-                'error': None
-            }
-            
-            # 1. Verifica se la company esiste nella tabella companies
-            company_query = "SELECT id, name FROM companies WHERE ticker = %s"
-            cursor.execute(company_query, (ticker,))
-            company_result = cursor.fetchone()
-            
-            if company_result:
-                result['company_exists'] = True
-                result['company_id'] = company_result[0]
-                result['company_name'] = company_result[1]
-                logger.info(f"✅ Company trovata: {company_result[1]} ({ticker})")
-            else:
-                logger.warning(f"⚠️ Company {ticker} non trovata nella tabella companies")
-                cursor.close()
-                return result
-            
-            # 2. Verifica dati insider sales
-            sales_query = """
-                SELECT COUNT(*) as count, MIN(it.transaction_date) as min_date, MAX(it.transaction_date) as max_date
-                FROM insider_transactions it
-                JOIN insider_filings if_t ON it.filing_id = if_t.id
-                JOIN companies c ON if_t.company_id = c.id
-                WHERE c.ticker = %s AND it.transaction_code = 'S'
-                  AND it.transaction_shares IS NOT NULL 
-                  AND it.transaction_price IS NOT NULL
-                  AND it.transaction_shares > 0
-                  AND it.transaction_price > 0
-            """
-            
-            cursor.execute(sales_query, (ticker,))
-            sales_result = cursor.fetchone()
-            
-            if sales_result and sales_result[0] > 0:
-                result['insider_sales_count'] = sales_result[0]
-                logger.info(f"✅ Trovate {sales_result[0]} vendite insider per {ticker}")
-            
-            # 3. Verifica dati insider purchases
-            purchases_query = """
-                SELECT COUNT(*) as count, MIN(it.transaction_date) as min_date, MAX(it.transaction_date) as max_date
-                FROM insider_transactions it
-                JOIN insider_filings if_t ON it.filing_id = if_t.id
-                JOIN companies c ON if_t.company_id = c.id
-                WHERE c.ticker = %s AND it.transaction_code = 'P'
-                  AND it.transaction_shares IS NOT NULL 
-                  AND it.transaction_price IS NOT NULL
-                  AND it.transaction_shares > 0
-                  AND it.transaction_price > 0
-            """
-            
-            cursor.execute(purchases_query, (ticker,))
-            purchases_result = cursor.fetchone()
-            
-            if purchases_result and purchases_result[0] > 0:
-                result['insider_purchases_count'] = purchases_result[0]
-                logger.info(f"✅ Trovati {purchases_result[0]} acquisti insider per {ticker}")
-            
-            # Combina date range per insider transactions
-            all_dates = []
-            if sales_result and sales_result[1]:
-                all_dates.extend([sales_result[1], sales_result[2]])
-            if purchases_result and purchases_result[1]:
-                all_dates.extend([purchases_result[1], purchases_result[2]])
-            
-            if all_dates:
-                result['date_range_insider'] = (min(all_dates), max(all_dates))
-                result['insider_data_exists'] = True
-            else:
-                logger.warning(f"⚠️ Nessuna transazione insider trovata per {ticker}")
-            
-            # 4. Verifica dati prezzi storici
-            try:
-                price_query = f"""
-                    SELECT COUNT(*) as count, MIN(Date) as min_date, MAX(Date) as max_date
-                    FROM sidan.{ticker}
+            with self._cursor(buffered=True) as cursor:
+                result = {
+                    'exists': False,
+                    'company_exists': False,
+                    'price_data_exists': False,
+                    'insider_data_exists': False,
+                    'insider_sales_count': 0,
+                    'insider_purchases_count': 0,
+                    'price_records': 0,
+                    'date_range_insider': None,
+                    'date_range_prices': None,
+                    'error': None
+                }
+            
+                # 1-3. Company e conteggi di vendite/acquisti in un solo round trip: il LEFT
+                # JOIN restituisce la company anche senza transazioni (codice NULL)
+                company_query = """
+                    SELECT c.id, c.name, it.transaction_code, COUNT(it.id) as count,
+                           MIN(it.transaction_date) as min_date, MAX(it.transaction_date) as max_date
+                    FROM companies c
+                    LEFT JOIN insider_filings if_t ON if_t.company_id = c.id
+                    LEFT JOIN insider_transactions it ON it.filing_id = if_t.id
+                      AND it.transaction_code IN ('S', 'P')
+                      AND it.transaction_shares IS NOT NULL 
+                      AND it.transaction_price IS NOT NULL
+                      AND it.transaction_shares > 0
+                      AND it.transaction_price > 0
+                    WHERE c.ticker = %s
+                    GROUP BY c.id, c.name, it.transaction_code
+                    ORDER BY c.id
                 """
+                cursor.execute(company_query, (ticker,))
+                rows = cursor.fetchall()
+            
+                if rows:
+                    result['company_exists'] = True
+                    result['company_id'] = rows[0][0]
+                    result['company_name'] = rows[0][1]
+                    logger.info(f"✅ Company trovata: {rows[0][1]} ({ticker})")
+                else:
+                    logger.warning(f"⚠️ Company {ticker} non trovata nella tabella companies")
+                    return result
+            
+                by_code = {row[2]: row[3:] for row in rows
+                           if row[0] == result['company_id'] and row[2] is not None}
+                sales_result = by_code.get('S')
+                purchases_result = by_code.get('P')
+            
+                if sales_result:
+                    result['insider_sales_count'] = sales_result[0]
+                    logger.info(f"✅ Trovate {sales_result[0]} vendite insider per {ticker}")
+            
+                if purchases_result:
+                    result['insider_purchases_count'] = purchases_result[0]
+                    logger.info(f"✅ Trovati {purchases_result[0]} acquisti insider per {ticker}")
+            
+                # Combina date range per insider transactions
+                all_dates = []
+                if sales_result and sales_result[1]:
+                    all_dates.extend([sales_result[1], sales_result[2]])
+                if purchases_result and purchases_result[1]:
+                    all_dates.extend([purchases_result[1], purchases_result[2]])
+            
+                if all_dates:
+                    result['date_range_insider'] = (min(all_dates), max(all_dates))
+                    result['insider_data_exists'] = True
+                else:
+                    logger.warning(f"⚠️ Nessuna transazione insider trovata per {ticker}")
+            
+                # 4. Verifica dati prezzi storici (solo se la tabella esiste)
+                try:
+                    if not self._has_price_table(ticker):
+                        raise LookupError("tabella non presente nello schema prezzi")
+                    
+                    price_query = f"""
+                        SELECT COUNT(*) as count, MIN(Date) as min_date, MAX(Date) as max_date
+                        FROM {_price_table(ticker)}
+                    """
                 
-                cursor.execute(price_query)
-                price_result = cursor.fetchone()
+                    cursor.execute(price_query)
+                    price_result = cursor.fetchone()
                 
-                if price_result and price_result[0] > 0:
-                    result['price_data_exists'] = True
-                    result['price_records'] = price_result[0]
-                    result['date_range_prices'] = (price_result[1], price_result[2])
-                    logger.info(f"✅ Trovati {price_result[0]} records di prezzo per {ticker}")
-                else:
-                    logger.warning(f"⚠️ Nessun dato di prezzo trovato nella tabella sidan.{ticker}")
+                    if price_result and price_result[0] > 0:
+                        result['price_data_exists'] = True
+                        result['price_records'] = price_result[0]
+                        result['date_range_prices'] = (price_result[1], price_result[2])
+                        logger.info(f"✅ Trovati {price_result[0]} records di prezzo per {ticker}")
+                    else:
+                        logger.warning(f"⚠️ Nessun dato di prezzo trovato nella tabella sidan.{ticker}")
                     
-            except Exception as price_error:
-                logger.warning(f"⚠️ Tabella sidan.{ticker} non esiste o errore: {price_error}")
+                except Exception as price_error:
+                    logger.warning(f"⚠️ Tabella sidan.{ticker} non esiste o errore: {price_error}")
             
-            # 5. Determina se il ticker è "utilizzabile"
-            result['exists'] = result['company_exists'] and (result['price_data_exists'] or result['insider_data_exists'])
+                # 5. Determina se il ticker è "utilizzabile"
+                result['exists'] = result['company_exists'] and (result['price_data_exists'] or result['insider_data_exists'])
             
-            cursor.close()
-            return result
+                return result
             
         except Exception as e:
             logger.error(f"❌ Errore nella verifica ticker {ticker}: {e}")
@@ -690,7 +1589,7 @@ class InsiderSalesVisualizer:
         """
         Testa la disponibilità dei dati sia per insider sales/purchases che per i prezzi storici.
         """
-        if not self.connection:
+        if not self.pool:
             logger.error("❌ Nessuna connessione al database")
             return
             
@@ -729,6 +1628,14 @@ class InsiderSalesVisualizer:
             else:
                 print(f"❌ Nessun dato di prezzo trovato")
             
+            if result['insider_sales_count'] > 0:
+                top_insiders = self.get_top_insiders(ticker)
+                if not top_insiders.empty:
+                    print(f"🏆 Top insider per valore vendite:")
+                    for row in top_insiders.itertuples(index=False):
+                        print(f"   {row.insider_name} ({row.insider_title or 'N/A'}): "
+                              f"${float(row.transaction_value):,.0f} in {row.transaction_count} vendite")
+            
             print(f"{'='*50}")
             
             if result['exists']:
@@ -774,11 +1681,11 @@ class InsiderSalesVisualizer:
             test_ax.plot([1, 2, 3], [1, 4, 2])
             test_ax.set_title("Test matplotlib")
             
-            plt.savefig("test_matplotlib.png")
+            test_fig.savefig("test_matplotlib.png")
             print(f"   ✅ Test creazione grafico: OK")
             
             plt.show(block=False)
-            plt.pause(0.5)
+            self._flush_canvas(test_fig)
             print(f"   ✅ Test visualizzazione: OK")
             
             plt.close(test_fig)